@@ -0,0 +1,293 @@
+# array_map.py
+# Structure-of-arrays map: terrain and item layers stored as NumPy arrays instead of Square objects
+import random
+
+import numpy as np
+
+from .item import FoodBonus, WaterBonus, GoldBonus
+from .map import (FOOD_CHANCE, FOOD_AMOUNT, WATER_CHANCE, WATER_AMOUNT, GOLD_CHANCE, GOLD_AMOUNT,
+                  TRADER_CHANCE, TRADER_CLASSES)
+from .spatial import ResourceIndex
+from .square import Square, item_kind
+from .terrain import TERRAIN_BY_ID, TERRAIN_POOLS, generate_terrain_for_difficulty
+
+# (terrain count, cost tables) last built by cost_tables()
+_cost_tables = (0, None)
+
+
+def cost_tables():
+    """
+    (move, food, water) cost lookup arrays indexed by the terrain id stored in the terrain layer.
+    Rebuilt whenever terrains have been registered since the last call, so ids handed out by
+    register_terrain after import are covered too.
+    """
+    global _cost_tables
+    count, tables = _cost_tables
+    if count != len(TERRAIN_BY_ID):
+        tables = tuple(np.array([getattr(t, cost) for t in TERRAIN_BY_ID], dtype=np.float64)
+                       for cost in ('move_cost', 'food_cost', 'water_cost'))
+        _cost_tables = (len(TERRAIN_BY_ID), tables)
+    return tables
+
+
+# Trader layer values: 0 = no trader, otherwise 1 + index into TRADER_CLASSES
+NO_TRADER = 0
+TRADER_KINDS = {cls: i + 1 for i, cls in enumerate(TRADER_CLASSES)}
+
+# Item odds are compared against full-range uint16 draws, the cheapest draw NumPy offers
+CHANCE_SCALE = 1 << 16
+
+
+def generate_layers(width, height, difficulty, seed=None):
+    """
+    Draw the terrain layer and every item layer with a few vectorized calls on one
+    seeded generator. Returns (terrain, food, water, gold, trader), each shaped (height, width).
+    """
+    rng = np.random.default_rng(seed)
+    shape = (height, width)
+
+    pool = np.array([t.id for t in TERRAIN_POOLS[difficulty]], dtype=np.uint8)
+    terrain = pool[rng.integers(0, len(pool), size=shape, dtype=np.uint8)]
+
+    def roll(chance):
+        hits = rng.integers(0, CHANCE_SCALE, size=shape, dtype=np.uint16) < round(chance * CHANCE_SCALE)
+        hits[:, 0] = False   # no items on the west edge
+        return hits
+
+    food = roll(FOOD_CHANCE).view(np.uint8)
+    water = roll(WATER_CHANCE).view(np.uint8)
+    gold = roll(GOLD_CHANCE).view(np.uint8)
+    trader = roll(TRADER_CHANCE).view(np.uint8)
+    trader *= rng.integers(1, len(TRADER_CLASSES) + 1, size=shape, dtype=np.uint8)
+    return terrain, food, water, gold, trader
+
+
+class ArrayMap:
+    """
+    Drop-in alternative to Map for large grids.
+    Terrain is a uint8 id array and every item type is a uint8 count (or trader kind) array.
+    get_square returns a SquareView; a real Square with item objects is only built for cells
+    whose items are actually touched, and from then on that Square owns the cell's items.
+    """
+
+    def __init__(self, width, height, difficulty, rng=None):
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.rng = rng if rng is not None else random
+
+        shape = (height, width)
+        self.terrain = np.zeros(shape, dtype=np.uint8)
+        self.food = np.zeros(shape, dtype=np.uint8)
+        self.water = np.zeros(shape, dtype=np.uint8)
+        self.gold = np.zeros(shape, dtype=np.uint8)
+        self.trader = np.zeros(shape, dtype=np.uint8)
+        self._squares = {}   # (x, y) -> Square for cells whose items have been touched
+        self.revision = 0     # bumped whenever an item is removed
+        self._resources = None
+
+        self.generate_map(difficulty)
+        self.place_items()
+
+    @classmethod
+    def generate(cls, width, height, difficulty, seed=None):
+        """Vectorized, seeded generation; the same seed always gives the same map"""
+        game_map = cls.from_layers(*generate_layers(width, height, difficulty, seed))
+        game_map.difficulty = difficulty
+        return game_map
+
+    @classmethod
+    def from_layers(cls, terrain, food, water, gold, trader):
+        """Wrap existing layer arrays (all shaped (height, width)) without copying them"""
+        game_map = cls.__new__(cls)
+        game_map.height, game_map.width = terrain.shape
+        game_map.difficulty = None
+        game_map.rng = random
+        game_map.terrain = terrain
+        game_map.food = food
+        game_map.water = water
+        game_map.gold = gold
+        game_map.trader = trader
+        game_map._squares = {}
+        game_map.revision = 0
+        game_map._resources = None
+        return game_map
+
+    @classmethod
+    def from_map(cls, game_map):
+        """Copy a Square-based Map into layer arrays"""
+        shape = (game_map.height, game_map.width)
+        terrain = np.zeros(shape, dtype=np.uint8)
+        food = np.zeros(shape, dtype=np.uint8)
+        water = np.zeros(shape, dtype=np.uint8)
+        gold = np.zeros(shape, dtype=np.uint8)
+        trader = np.zeros(shape, dtype=np.uint8)
+        for y in range(game_map.height):
+            for x in range(game_map.width):
+                square = game_map.get_square(x, y)
+                terrain[y, x] = square.terrain.id
+                for item in square.items:
+                    if isinstance(item, FoodBonus):
+                        food[y, x] += 1
+                    elif isinstance(item, WaterBonus):
+                        water[y, x] += 1
+                    elif isinstance(item, GoldBonus):
+                        gold[y, x] += 1
+                    else:
+                        trader[y, x] = TRADER_KINDS.get(type(item), NO_TRADER)
+        return cls.from_layers(terrain, food, water, gold, trader)
+
+    def generate_map(self, difficulty):
+        # Same draws as Map.generate_map, so an equally seeded rng gives the same terrain
+        for y in range(self.height):
+            for x in range(self.width):
+                terrain = generate_terrain_for_difficulty(difficulty, self.rng)
+                self.terrain[y, x] = terrain.id
+
+    def place_items(self):
+        # Same draws as Map.place_items, so an equally seeded rng gives the same items
+        for y in range(self.height):
+            for x in range(1, self.width):
+                if self.rng.random() < FOOD_CHANCE:
+                    self.food[y, x] += 1
+                if self.rng.random() < WATER_CHANCE:
+                    self.water[y, x] += 1
+                if self.rng.random() < GOLD_CHANCE:
+                    self.gold[y, x] += 1
+                if self.rng.random() < TRADER_CHANCE:
+                    self.trader[y, x] = TRADER_KINDS[self.rng.choice(TRADER_CLASSES)]
+
+    def get_square(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            square = self._squares.get((x, y))
+            if square is not None:
+                return square
+            return SquareView(self, x, y)
+        return None
+
+    def terrain_at(self, x, y):
+        return TERRAIN_BY_ID[self.terrain[y, x]]
+
+    def square_for_update(self, x, y):
+        """The square at (x, y) for code that is about to change its items: always a real Square"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.materialize(x, y)
+        return None
+
+    def remove_item(self, x, y, item):
+        """
+        Remove a consumed item from the square at (x, y).
+        Goes through the map rather than the Square so caches keyed on revision notice the change.
+        """
+        square = self.materialize(x, y)
+        if item not in square.items:
+            return
+        square.remove_item(item)
+        self.revision += 1
+        kind = item_kind(type(item))
+        if kind and self._resources is not None:
+            self._resources.remove(kind, x, y)
+
+    @property
+    def resources(self):
+        """Spatial index of every item (see spatial.ResourceIndex), built on first use from the layers"""
+        if self._resources is None:
+            index = ResourceIndex()
+            for kind, layer in (('food', self.food), ('water', self.water), ('gold', self.gold)):
+                ys, xs = np.nonzero(layer)
+                for x, y, n in zip(xs.tolist(), ys.tolist(), layer[ys, xs].tolist()):
+                    if (x, y) not in self._squares:
+                        index.add(kind, x, y, n)
+            ys, xs = np.nonzero(self.trader)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                if (x, y) not in self._squares:
+                    index.add('trader', x, y)
+            # materialized squares own their items, which may differ from the layers
+            for (x, y), square in self._squares.items():
+                for kind in ('food', 'water', 'gold', 'trader'):
+                    n = getattr(square, kind + '_count')
+                    if n:
+                        index.add(kind, x, y, n)
+            self._resources = index
+        return self._resources
+
+    def nearest_items(self, kind, x, y, k=1):
+        """Coordinates of the k squares holding `kind` ('food', 'water', 'gold', 'trader') closest to (x, y)"""
+        return self.resources.nearest(kind, x, y, k)
+
+    def items_within(self, kind, x, y, radius):
+        """Coordinates of squares holding `kind` at most radius moves from (x, y), closest first"""
+        return self.resources.within(kind, x, y, radius)
+
+    def display(self):
+        codes = [t.short_code() for t in TERRAIN_BY_ID]
+        for row in self.terrain:
+            print(" ".join(codes[t] for t in row))
+
+    def is_valid_position(self, coords):
+        """
+        Return True if coords is inside the map bounds.
+        """
+        x, y = coords
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def materialize(self, x, y):
+        """Return the Square that owns the items at (x, y), building it from the layers if needed"""
+        square = self._squares.get((x, y))
+        if square is None:
+            square = self._squares[(x, y)] = self.build_square(x, y)
+        return square
+
+    def build_square(self, x, y):
+        """A new Square with the items the layers hold at (x, y); the map doesn't keep it"""
+        square = Square(x, y, self.terrain_at(x, y))
+        # Same item order as Map.place_items
+        for _ in range(self.food[y, x]):
+            square.add_item(FoodBonus(amount=FOOD_AMOUNT, repeating=False))
+        for _ in range(self.water[y, x]):
+            square.add_item(WaterBonus(amount=WATER_AMOUNT, repeating=True))
+        for _ in range(self.gold[y, x]):
+            square.add_item(GoldBonus(amount=GOLD_AMOUNT, repeating=False))
+        kind = self.trader[y, x]
+        if kind != NO_TRADER:
+            square.add_item(TRADER_CLASSES[kind - 1]())
+        return square
+
+
+class SquareView:
+    """Read-only stand-in for a Square whose items have not been touched yet"""
+    __slots__ = ('game_map', 'x', 'y')
+
+    def __init__(self, game_map, x, y):
+        self.game_map = game_map
+        self.x = x
+        self.y = y
+
+    @property
+    def terrain(self):
+        return self.game_map.terrain_at(self.x, self.y)
+
+    @property
+    def items(self):
+        return self.game_map.materialize(self.x, self.y).items
+
+    def add_item(self, item):
+        self.game_map.materialize(self.x, self.y).add_item(item)
+
+    def remove_item(self, item):
+        self.game_map.materialize(self.x, self.y).remove_item(item)
+
+    def is_passable(self):
+        return True
+
+    def has_food_bonus(self):
+        return self.game_map.food[self.y, self.x] > 0
+
+    def has_water_bonus(self):
+        return self.game_map.water[self.y, self.x] > 0
+
+    def has_gold_bonus(self):
+        return self.game_map.gold[self.y, self.x] > 0
+
+    def has_trader(self):
+        return self.game_map.trader[self.y, self.x] != NO_TRADER
@@ -0,0 +1,252 @@
+# benchmark.py
+# Fixed-seed timing and memory benchmarks for map generation, vision queries, brain decisions and whole games
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from wss.game import BRAIN_CHOICES, VISION_CHOICES, new_player, simulate
+from wss.map import Map, TRADER_CLASSES
+
+SEED = 1234
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+MAP_SIZES = [(30, 15), (100, 50), (300, 150)]
+QUICK_MAP_SIZES = [(30, 15), (100, 50)]
+VISION_QUERIES = ('closest_food', 'closest_water', 'closest_gold', 'closest_trader', 'easiest_path')
+
+QUERY_MAP_SIZE = (60, 30)   # map the vision and brain benchmarks run on
+POSITIONS = 200             # player positions each vision/brain benchmark cycles through
+GAME_SIZE = (30, 15)
+GAMES = 30
+
+DEFAULT_THRESHOLD = 0.25    # slowdown against the baseline that counts as a regression
+
+
+class Case:
+    """
+    One benchmark: setup() returns (run, ops), where run() performs ops operations.
+    Setup is not timed, and every case builds its inputs from SEED so runs are comparable.
+    """
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+
+
+def _positions(game_map, count, seed=SEED):
+    """Reproducible player positions away from the east edge"""
+    rng = random.Random(seed)
+    return [(rng.randrange(0, game_map.width - 1), rng.randrange(game_map.height)) for _ in range(count)]
+
+
+def _map_case(width, height, difficulty):
+    def setup():
+        def run():
+            Map(width, height, difficulty, rng=random.Random(SEED))
+        return run, 1
+    return Case(f"map.generate.{width}x{height}.{difficulty}", setup)
+
+
+def _vision_case(vision_name, query):
+    def setup():
+        game_map = Map(*QUERY_MAP_SIZE, 'medium', rng=random.Random(SEED))
+        player = new_player(VISION_CHOICES[vision_name](), BRAIN_CHOICES['survival'](), game_map.height)
+        positions = _positions(game_map, POSITIONS)
+        method = getattr(player.vision, query)
+
+        def run():
+            # every call is at a new position, so no snapshot is reused between calls
+            for location in positions:
+                player.location = location
+                method(game_map, player)
+        return run, len(positions)
+    return Case(f"vision.{vision_name}.{query}", setup)
+
+
+def _make_move_case(brain_name, vision_name):
+    def setup():
+        game_map = Map(*QUERY_MAP_SIZE, 'medium', rng=random.Random(SEED))
+        player = new_player(VISION_CHOICES[vision_name](), BRAIN_CHOICES[brain_name](), game_map.height)
+        rng = random.Random(SEED)
+        # mixed resource levels so every branch of the brain gets exercised
+        states = [(location, rng.randint(1, 10), rng.randint(1, 10), rng.randint(1, 10), rng.randint(0, 10))
+                  for location in _positions(game_map, POSITIONS)]
+
+        def run():
+            for location, strength, food, water, gold in states:
+                player.location = location
+                player.current_strength = strength
+                player.current_food = food
+                player.current_water = water
+                player.current_gold = gold
+                player.brain.make_move(player, game_map)
+        return run, len(states)
+    return Case(f"brain.{brain_name}.make_move.{vision_name}", setup)
+
+
+def _decide_trade_case(brain_name):
+    def setup():
+        game_map = Map(*QUERY_MAP_SIZE, 'medium', rng=random.Random(SEED))
+        player = new_player(VISION_CHOICES['focused'](), BRAIN_CHOICES[brain_name](), game_map.height)
+        traders = [cls() for cls in TRADER_CLASSES] * 50
+
+        def run():
+            for trader in traders:
+                player.brain.decide_trade(trader, player, game_map)
+        return run, len(traders)
+    return Case(f"brain.{brain_name}.decide_trade", setup)
+
+
+def _game_case(brain_name, vision_name, games):
+    def setup():
+        width, height = GAME_SIZE
+
+        def run():
+            for seed in range(SEED, SEED + games):
+                simulate(width, height, DIFFICULTIES[seed % 3], vision_name, brain_name, seed=seed)
+        return run, games
+    return Case(f"game.{brain_name}.{vision_name}", setup)
+
+
+def default_cases(quick=False):
+    """Every benchmark, in report order; quick drops the largest maps and plays fewer games"""
+    cases = []
+    for width, height in (QUICK_MAP_SIZES if quick else MAP_SIZES):
+        for difficulty in DIFFICULTIES:
+            cases.append(_map_case(width, height, difficulty))
+    for vision_name in VISION_CHOICES:
+        for query in VISION_QUERIES:
+            cases.append(_vision_case(vision_name, query))
+    for brain_name in BRAIN_CHOICES:
+        for vision_name in VISION_CHOICES:
+            cases.append(_make_move_case(brain_name, vision_name))
+        cases.append(_decide_trade_case(brain_name))
+    for brain_name in BRAIN_CHOICES:
+        for vision_name in VISION_CHOICES:
+            cases.append(_game_case(brain_name, vision_name, GAMES // 3 if quick else GAMES))
+    return cases
+
+
+def measure(case, repeat=5):
+    """
+    Time case repeat times and return its result row.
+    The best repeat is the headline figure (least disturbed by other load); the median is kept too.
+    Peak memory comes from one extra, separately traced run, since tracemalloc slows everything down.
+    """
+    run, ops = case.setup()
+    run()   # warm caches and imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'ops': ops,
+        'best_s': best,
+        'median_s': statistics.median(times),
+        'us_per_op': best / ops * 1e6,
+        'ops_per_s': ops / best if best else float('inf'),
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_benchmarks(cases=None, repeat=5, name_filter=None, progress=None):
+    """Measure every case (optionally only names containing name_filter) and return the JSON report"""
+    cases = cases if cases is not None else default_cases()
+    results = {}
+    for case in cases:
+        if name_filter and name_filter not in case.name:
+            continue
+        results[case.name] = measure(case, repeat)
+        if progress:
+            progress(case.name, results[case.name])
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'seed': SEED,
+            'repeat': repeat,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare per-op times with a baseline report.
+    Returns (name, baseline us/op, current us/op, ratio) for every benchmark in both reports,
+    and the subset whose ratio is above 1 + threshold.
+    """
+    rows = []
+    for name, result in report['results'].items():
+        old = baseline['results'].get(name)
+        if not old:
+            continue
+        ratio = result['us_per_op'] / old['us_per_op'] if old['us_per_op'] else float('inf')
+        rows.append((name, old['us_per_op'], result['us_per_op'], ratio))
+    regressions = [row for row in rows if row[3] > 1 + threshold]
+    return rows, regressions
+
+
+def print_report(report, out=sys.stdout):
+    print(f"{'benchmark':<44} {'us/op':>12} {'ops/s':>12} {'peak KiB':>10}", file=out)
+    for name, r in report['results'].items():
+        print(f"{name:<44} {r['us_per_op']:>12.1f} {r['ops_per_s']:>12.1f} {r['peak_kib']:>10.1f}", file=out)
+
+
+def print_comparison(rows, threshold, out=sys.stdout):
+    print(f"\n{'benchmark':<44} {'baseline':>12} {'current':>12} {'change':>8}", file=out)
+    for name, old, new, ratio in rows:
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:<44} {old:>12.1f} {new:>12.1f} {(ratio - 1) * 100:>+7.1f}%{flag}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark map generation, vision, brains and whole games.")
+    parser.add_argument('--quick', action='store_true', help="skip the largest maps and play fewer games")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark (the best is reported)")
+    parser.add_argument('--json', help="write the report to this file")
+    parser.add_argument('--baseline', help="report to compare against; exits with status 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio counted as a regression (0.25 = 25%% slower)")
+    args = parser.parse_args(argv)
+
+    def progress(name, result):
+        print(f"{name:<44} {result['us_per_op']:>12.1f} us/op", file=sys.stderr)
+
+    report = run_benchmarks(default_cases(args.quick), args.repeat, args.filter, progress)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
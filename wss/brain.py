@@ -1,7 +1,6 @@
 # brain.py
 # Player decision making strategy
-import heapq
-
+from wss.events import DETAIL, emit
 from wss.path import Path
 
 # Direction map used for movement lookup (must match game DIRECTION_MAP)
@@ -18,6 +17,11 @@ DIRECTION_VECTORS = {
 
 
 class Brain:
+    # True when decide_trade depends only on the trader's offer and the player's resources,
+    # so trade outcomes can be memoized. Subclasses that override decide_trade must set it
+    # again themselves (see negotiation.memoizable)
+    pure_trade = False
+
     def make_move(self, player, game_map):
         raise NotImplementedError
 
@@ -50,17 +54,19 @@ class Brain:
 
 class SurvivalBrain(Brain):
     # standard critical thinking brain focused on survival
+    pure_trade = True
+
     def make_move(self, player, game_map):
-        print("\n[SurvivalBrain] Evaluating best move...")
+        emit(DETAIL, 'brain.move', "\n[SurvivalBrain] Evaluating best move...")
 
         # Step 1: If strength is critically low → rest
         if player.current_strength <= 2:
-            print("Low strength — resting.")
+            emit(DETAIL, 'brain.move', "Low strength — resting.")
             return "rest"
 
         # Step 2: Seek water if hydration is low
         if player.current_water <= 3:
-            print("Seeking water — hydration low.")
+            emit(DETAIL, 'brain.move', "Seeking water — hydration low.")
             path = player.vision.closest_water(game_map, player)
             self._print_path_info("Water", path)
             if path and self._can_move(path, player, game_map):
@@ -68,7 +74,7 @@ class SurvivalBrain(Brain):
 
         # Step 3: Seek food if nutrition is low
         if player.current_food <= 3:
-            print("Seeking food — nutrition low.")
+            emit(DETAIL, 'brain.move', "Seeking food — nutrition low.")
             path = player.vision.closest_food(game_map, player)
             self._print_path_info("Food", path)
             if path and self._can_move(path, player, game_map):
@@ -78,109 +84,111 @@ class SurvivalBrain(Brain):
         path = player.vision.easiest_path(game_map, player)
         self._print_path_info("Easiest Path", path)
         if path and self._can_move(path, player, game_map):
-            print("Proceeding eastward.")
+            emit(DETAIL, 'brain.move', "Proceeding eastward.")
             return path.directions[0]
 
         # Step 5: No viable or safe path — rest
-        print("No affordable path — resting.")
+        emit(DETAIL, 'brain.move', "No affordable path — resting.")
         return "rest"
 
     def _print_path_info(self, label, path):
         if path:
-            print(f"\n[Path Info — {label}]")
-            print(path)
+            emit(DETAIL, 'brain.path', "\n[Path Info — {}]\n{}", label, path)
         else:
-            print(f"[Path Info — {label}] No valid path found.")
+            emit(DETAIL, 'brain.path', "[Path Info — {}] No valid path found.", label)
 
     def decide_trade(self, trader, player, game_map):
         offer, request = trader.default_offer()
-        print(f"[SurvivalBrain] Evaluate trade: give {offer} → get {request}")
+        emit(DETAIL, 'brain.trade', "[SurvivalBrain] Evaluate trade: give {} → get {}", offer, request)
         # weight values: gold=3, food=1, water=1
         weights = {'gold': 3, 'food': 1, 'water': 1}
         net = sum(request.get(r,0)*weights[r] for r in weights) - sum(offer.get(r,0)*weights[r] for r in weights)
         if net >= 0:
-            print(f"[SurvivalBrain] Net value {net} ≥ 0: accepting trade.")
+            emit(DETAIL, 'brain.trade', "[SurvivalBrain] Net value {} ≥ 0: accepting trade.", net)
             return offer, request
-        print(f"[SurvivalBrain] Net value {net} < 0: walking away.")
+        emit(DETAIL, 'brain.trade', "[SurvivalBrain] Net value {} < 0: walking away.", net)
         return None, None
 
 class RiskyBrain(Brain):
     # brain risks everything to move east indefinitely
+    pure_trade = True
+
     def make_move(self, player, game_map):
-        print("\n[RiskyBrain] Charging forward no matter what!")
+        emit(DETAIL, 'brain.move', "\n[RiskyBrain] Charging forward no matter what!")
 
         # Step 1: If literally dying, rest
         if player.current_strength <= 0:
-            print("Zero strength — forced rest.")
+            emit(DETAIL, 'brain.move', "Zero strength — forced rest.")
             return "rest"
 
         # Step 2: Stop only if you're out of food or water
         if player.current_food == 0 or player.current_water == 0:
-            print("Critical starvation/dehydration — emergency rest.")
+            emit(DETAIL, 'brain.move', "Critical starvation/dehydration — emergency rest.")
             return "rest"
 
         # Step 3: Always try to move east
         path = player.vision.easiest_path(game_map, player)
         self._print_path_info("Easiest Path", path)
         if self._can_move(path, player, game_map):
-            print("Advancing east despite risks.")
+            emit(DETAIL, 'brain.move', "Advancing east despite risks.")
             return path.directions[0]
 
         # Step 4: No path? Rest
-        print("No known path — resting.")
+        emit(DETAIL, 'brain.move', "No known path — resting.")
         return "rest"
 
     def _print_path_info(self, label, path):
         if path:
-            print(f"\n[Path Info — {label}]")
-            print(path)
+            emit(DETAIL, 'brain.path', "\n[Path Info — {}]\n{}", label, path)
         else:
-            print(f"[Path Info — {label}] No valid path found.")
+            emit(DETAIL, 'brain.path', "[Path Info — {}] No valid path found.", label)
 
     def decide_trade(self, trader, player, game_map):
         offer, request = trader.default_offer()
-        print(f"[RiskyBrain] Evaluate trade: give {offer} → get {request}")
+        emit(DETAIL, 'brain.trade', "[RiskyBrain] Evaluate trade: give {} → get {}", offer, request)
         # Accept any offer that grants any resource
         if any(amount > 0 for amount in request.values()):
-            print(f"[RiskyBrain] Gains {request}, accepting.")
+            emit(DETAIL, 'brain.trade', "[RiskyBrain] Gains {}, accepting.", request)
             return offer, request
-        print("[RiskyBrain] No gain, rejecting.")
+        emit(DETAIL, 'brain.trade', "[RiskyBrain] No gain, rejecting.")
         return None, None
 
 
 
 class ResourceBrain(Brain):
     # Strategy focused on collecting resources before moving east
+    pure_trade = True
+
     def make_move(self, player, game_map):
         # Urgent water
         if player.current_water <= 2:
-            print("Urgent need: water.")
+            emit(DETAIL, 'brain.move', "Urgent need: water.")
             path = player.vision.closest_water(game_map, player)
             if self._can_move(path, player, game_map):
                 return path.directions[0]
 
         # Urgent food
         if player.current_food <= 2:
-            print("Urgent need: food")
+            emit(DETAIL, 'brain.move', "Urgent need: food")
             path = player.vision.closest_food(game_map, player)
             if self._can_move(path, player, game_map):
                 return path.directions[0]
 
         # Rest if low strength
         if player.current_strength <= 3:
-            print("Low strength - resting")
+            emit(DETAIL, 'brain.move', "Low strength - resting")
             return "rest"
 
         # Refill water if below threshold
         if player.current_water < player.max_water * 0.7:
-            print("seeking water - below 70%")
+            emit(DETAIL, 'brain.move', "seeking water - below 70%")
             path = player.vision.closest_water(game_map, player)
             if self._can_move(path, player, game_map):
                 return path.directions[0]
 
         # Refill food if below threshold
         if player.current_food < player.max_food * 0.7:
-            print("seeking food - below 70%")
+            emit(DETAIL, 'brain.move', "seeking food - below 70%")
             path = player.vision.closest_food(game_map, player)
             if self._can_move(path, player, game_map):
                 return path.directions[0]
@@ -188,7 +196,7 @@ class ResourceBrain(Brain):
         # collect nearby gold
         path = player.vision.closest_gold(game_map, player)
         if self._can_move(path, player, game_map):
-            print("Collecting nearby gold.")
+            emit(DETAIL, 'brain.move', "Collecting nearby gold.")
             return path.directions[0]
 
         # visit trader if affordable
@@ -198,7 +206,7 @@ class ResourceBrain(Brain):
                 return path.directions[0]
 
         # default: move east
-        print("Default: moving east")
+        emit(DETAIL, 'brain.move', "Default: moving east")
         path = player.vision.easiest_path(game_map, player)
         if self._can_move(path, player, game_map):
             return path.directions[0]
@@ -208,28 +216,27 @@ class ResourceBrain(Brain):
 
     def _print_path_info(self, label, path):
         if path:
-            print(f"\n[Path Info — {label}]")
-            print(path)
+            emit(DETAIL, 'brain.path', "\n[Path Info — {}]\n{}", label, path)
         else:
-            print(f"[Path Info — {label}] No valid path found.")
+            emit(DETAIL, 'brain.path', "[Path Info — {}] No valid path found.", label)
 
     def decide_trade(self, trader, player, game_map):
         offer, request = trader.default_offer()
-        print(f"[ResourceBrain] Evaluate trade: give {offer} → get {request}")
+        emit(DETAIL, 'brain.trade', "[ResourceBrain] Evaluate trade: give {} → get {}", offer, request)
         # Urgent needs
         if player.current_water <= 3 and request.get('water',0) > 0:
-            print("[ResourceBrain] Urgent need water: accepting.")
+            emit(DETAIL, 'brain.trade', "[ResourceBrain] Urgent need water: accepting.")
             return offer, request
         if player.current_food <= 3 and request.get('food',0) > 0:
-            print("[ResourceBrain] Urgent need food: accepting.")
+            emit(DETAIL, 'brain.trade', "[ResourceBrain] Urgent need food: accepting.")
             return offer, request
         # Otherwise evaluate net value
         weights = {'gold': 3, 'food': 1, 'water': 1}
         net = sum(request.get(r,0)*weights[r] for r in weights) - sum(offer.get(r,0)*weights[r] for r in weights)
         if net >= 0:
-            print(f"[ResourceBrain] Net value {net} ≥ 0: accepting trade.")
+            emit(DETAIL, 'brain.trade', "[ResourceBrain] Net value {} ≥ 0: accepting trade.", net)
             return offer, request
-        print(f"[ResourceBrain] Net value {net} < 0: walking away.")
+        emit(DETAIL, 'brain.trade', "[ResourceBrain] Net value {} < 0: walking away.", net)
         return None, None
 
 
@@ -0,0 +1,122 @@
+# chunked_map.py
+# Very wide (or endless) map generated lazily in column chunks, with least-recently-used eviction
+import math
+import random
+from collections import OrderedDict
+
+from .map import stock_square
+from .square import Square, item_kind
+from .terrain import generate_terrain_for_difficulty
+
+
+class ChunkedMap:
+    """
+    Map made of chunk_width-column chunks that are generated the first time get_square touches them.
+    Each chunk draws from its own random.Random seeded by (seed, chunk index), so a chunk is
+    identical no matter when or how often it is generated.
+
+    At most max_chunks chunks stay in memory; the least recently used one (in practice the one
+    furthest behind the player) is dropped first. Items consumed in a dropped chunk are remembered
+    and removed again if the chunk is regenerated. Other item state (trader moods, the turn a
+    repeating bonus was last collected) is regenerated fresh.
+
+    width=None makes the map endless: the player can never reach an east edge.
+    Whether endless or not, Vision(whole_map=True) and Vision.nearest_on_map would have to
+    generate every chunk, so they raise TypeError on a ChunkedMap; use ordinary sight-limited
+    visions.
+    """
+
+    def __init__(self, height, difficulty, seed=0, width=None, chunk_width=64, max_chunks=16):
+        if max_chunks < 2:
+            raise ValueError("max_chunks must be at least 2 so a player can see across a chunk border")
+        self.width = width if width is not None else math.inf
+        self.height = height
+        self.difficulty = difficulty
+        self.seed = seed
+        self.chunk_width = chunk_width
+        self.max_chunks = max_chunks
+        self.revision = 0     # bumped whenever an item is removed
+        self.chunks_generated = 0
+
+        self._chunks = OrderedDict()   # chunk index -> grid rows, least recently used first
+        self._consumed = {}            # chunk index -> {(x, y, kind)} removed from that chunk
+
+    def _chunk(self, index):
+        chunk = self._chunks.get(index)
+        if chunk is not None:
+            self._chunks.move_to_end(index)
+            return chunk
+
+        chunk = self._generate_chunk(index)
+        self._chunks[index] = chunk
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def _generate_chunk(self, index):
+        rng = random.Random(f"{self.seed}:{index}")
+        x0 = index * self.chunk_width
+        x1 = x0 + self.chunk_width
+        if self.width != math.inf:
+            x1 = min(x1, self.width)
+
+        rows = []
+        for y in range(self.height):
+            rows.append([Square(x, y, generate_terrain_for_difficulty(self.difficulty, rng))
+                         for x in range(x0, x1)])
+        for row in rows:
+            for square in row:
+                # Skip the starting column (west edge) so players don't get freebies immediately
+                if square.x == 0:
+                    continue
+                stock_square(square, rng)
+
+        for x, y, kind in self._consumed.get(index, ()):
+            square = rows[y][x - x0]
+            for item in square.items:
+                if item_kind(type(item)) == kind:
+                    square.remove_item(item)
+                    break
+
+        self.chunks_generated += 1
+        return rows
+
+    def get_square(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = x // self.chunk_width
+            return self._chunk(index)[y][x - index * self.chunk_width]
+        return None
+
+    def is_valid_position(self, coords):
+        """
+        Return True if coords is inside the map bounds (without generating anything).
+        """
+        x, y = coords
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def square_for_update(self, x, y):
+        """The square at (x, y) for code that is about to change its items (see game_state.MapBranch)"""
+        return self.get_square(x, y)
+
+    def remove_item(self, x, y, item):
+        """
+        Remove a consumed item from the square at (x, y), remembering it in case the chunk is evicted.
+        """
+        square = self.get_square(x, y)
+        if item not in square.items:
+            return
+        square.remove_item(item)
+        self.revision += 1
+        if not item.repeating:
+            self._consumed.setdefault(x // self.chunk_width, set()).add((x, y, item_kind(type(item))))
+
+    def resident_chunks(self):
+        """Indices of the chunks currently in memory, least recently used first"""
+        return list(self._chunks)
+
+    def display(self):
+        """Print the chunks currently in memory, west to east"""
+        indices = sorted(self._chunks)
+        for y in range(self.height):
+            print(" ".join(square.terrain.short_code()
+                           for index in indices for square in self._chunks[index][y]))
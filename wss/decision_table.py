@@ -0,0 +1,261 @@
+# decision_table.py
+# Rule-based brains compiled into lookup tables keyed by quantized resources and the visible neighbourhood
+import bisect
+import hashlib
+import inspect
+import os
+import pickle
+import random
+import sys
+
+from wss.array_map import ArrayMap
+from wss.brain import Brain
+from wss.player import Player
+from wss.terrain import TERRAIN_BY_ID
+
+TABLE_VERSION = 2
+TRAINING_MAP_SIZE = (30, 15)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'wss', 'decision_tables')
+
+# Neighbourhood encoding, per visible square: offset, terrain id and item bits
+ITEM_FOOD, ITEM_WATER, ITEM_GOLD, ITEM_TRADER = 1, 2, 4, 8
+_OFFSET_BITS = 4      # dx and dy are stored + 8, so visions may see up to 7 squares away
+
+
+# What each rule-based brain looks at, beyond the terrain costs Brain._can_move checks:
+# (item kinds whose closest_* query it makes, strength, food and water constants it compares with).
+# A rule added to a brain must be added here too; verify() catches omissions.
+BRAIN_INPUTS = {
+    'survival': (ITEM_FOOD | ITEM_WATER, {2}, {3}, {3}),
+    'risky': (0, {0}, {0}, {0}),
+    'resource': (ITEM_FOOD | ITEM_WATER | ITEM_GOLD | ITEM_TRADER, {3}, {2, 3, 'max'}, {2, 3, 'max'}),
+}
+# brains not listed are assumed to look at everything the three above do
+_ANY_BRAIN = (ITEM_FOOD | ITEM_WATER | ITEM_GOLD | ITEM_TRADER, {0, 2, 3}, {0, 2, 3, 'max'}, {0, 2, 3, 'max'})
+REFILL_SHARE = 0.7   # ResourceBrain refills food and water below this share of the maximum ('max' above)
+
+
+def brain_inputs(brain_name, maxima):
+    """(item mask, strength thresholds, food thresholds, water thresholds) for a brain"""
+    items, strength, food, water = BRAIN_INPUTS.get(brain_name, _ANY_BRAIN)
+    _, max_food, max_water = maxima
+
+    def resolve(constants, maximum, costs):
+        values = {maximum * REFILL_SHARE if c == 'max' else c for c in constants}
+        return sorted(values | costs)
+
+    return (items,
+            resolve(strength, None, {t.move_cost for t in TERRAIN_BY_ID}),
+            resolve(food, max_food, {t.food_cost for t in TERRAIN_BY_ID}),
+            resolve(water, max_water, {t.water_cost for t in TERRAIN_BY_ID}))
+
+
+def code_version(brain_cls, vision_cls):
+    """
+    Hash of everything a table's entries were computed by: the source of the modules defining
+    the brain and vision classes (and their bases), of the player, path and table modules, and
+    the registered terrains. A table saved under another version is stale. None when some
+    source isn't available, in which case tables are never reused.
+    """
+    modules = {cls.__module__ for base in (brain_cls, vision_cls) for cls in base.__mro__
+               if cls is not object}
+    modules |= {'wss.player', 'wss.path', __name__}
+    digest = hashlib.sha256()
+    try:
+        for name in sorted(modules):
+            digest.update(inspect.getsource(sys.modules[name]).encode())
+    except (OSError, TypeError, KeyError):
+        return None
+    for t in TERRAIN_BY_ID:
+        digest.update(repr((t.name, t.move_cost, t.food_cost, t.water_cost)).encode())
+    return digest.hexdigest()
+
+
+def _level(value, thresholds):
+    """
+    Which interval between the thresholds value falls in, with the thresholds themselves as
+    intervals of their own. Any comparison of value with a threshold (<, <=, ==, >=, >) gives
+    the same answer for every value of the same level.
+    """
+    i = bisect.bisect_left(thresholds, value)
+    if i < len(thresholds) and thresholds[i] == value:
+        return 2 * i + 1
+    return 2 * i
+
+
+class DecisionTable:
+    """
+    make_move results of one brain class seeing through one vision class, for players with
+    the given maximum resources. Keys are built by key(); entries fill in as states are met.
+    """
+
+    def __init__(self, brain_name, vision_name, maxima, version=None):
+        self.brain_name = brain_name
+        self.vision_name = vision_name
+        self.maxima = maxima   # (max_strength, max_food, max_water)
+        self.version = version   # code_version() of the brain and vision the entries came from
+        self.item_mask, *self.thresholds = brain_inputs(brain_name, maxima)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, player, game_map):
+        """
+        The state make_move depends on: the levels of strength, food and water, and a bitmask
+        of every visible square's offset, terrain and the items the brain cares about.
+        """
+        strength, food, water = self.thresholds
+        levels = (_level(player.current_strength, strength),
+                  _level(player.current_food, food),
+                  _level(player.current_water, water))
+
+        # terrain ids take as many bits as the terrains registered so far need
+        terrain_bits = max(1, (len(TERRAIN_BY_ID) - 1).bit_length())
+        square_bits = 2 * _OFFSET_BITS + terrain_bits + 4
+        x, y = player.location
+        mask = 0
+        for vx, vy in player.vision.get_visible_squares(game_map, player):
+            square = game_map.get_square(vx, vy)
+            items = ((ITEM_FOOD if square.has_food_bonus() else 0)
+                     | (ITEM_WATER if square.has_water_bonus() else 0)
+                     | (ITEM_GOLD if square.has_gold_bonus() else 0)
+                     | (ITEM_TRADER if square.has_trader() else 0))
+            code = ((((vx - x + 8) << _OFFSET_BITS | (vy - y + 8)) << terrain_bits | square.terrain.id) << 4
+                    | items & self.item_mask)
+            mask = mask << square_bits | code
+        return levels, mask
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((TABLE_VERSION, self.version, self.brain_name, self.vision_name, self.maxima,
+                         self.entries), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, brain_name, vision_name, maxima, version=None):
+        """
+        The table stored at path, or an empty one if it is missing, stale (saved by other code,
+        or version is None) or for something else
+        """
+        table = cls(brain_name, vision_name, maxima, version)
+        if version is None:
+            return table
+        try:
+            with open(path, 'rb') as f:
+                file_version, code, b, v, m, entries = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return table
+        if (file_version, code, b, v, tuple(m)) == (TABLE_VERSION, version, brain_name, vision_name,
+                                                    tuple(maxima)):
+            table.entries = entries
+        return table
+
+
+def table_path(brain_name, vision_name, maxima, cache_dir=None):
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR,
+                        f"{brain_name}-{vision_name}-{'-'.join(map(str, maxima))}.pkl")
+
+
+class CompiledBrain(Brain):
+    """
+    Wraps a rule-based brain: make_move is a table lookup, and the wrapped brain is only asked
+    (and its answer stored) for states the table hasn't seen. Lookups emit no DETAIL messages.
+    Trading is left to the wrapped brain.
+    """
+
+    def __init__(self, brain, table):
+        self.brain = brain
+        self.table = table
+
+    def make_move(self, player, game_map):
+        key = self.table.key(player, game_map)
+        action = self.table.entries.get(key)
+        if action is None:
+            self.table.misses += 1
+            action = self.brain.make_move(player, game_map)
+            self.table.entries[key] = action
+        else:
+            self.table.hits += 1
+        return action
+
+    def decide_trade(self, trader, player, game_map):
+        return self.brain.decide_trade(trader, player, game_map)
+
+
+def random_states(vision_cls, maxima, count, seed=0, size=7):
+    """
+    Yield count (game_map, player) pairs: small random maps of every difficulty, a random
+    position (edges included) and random half-unit resources from just below zero to the maximum.
+    """
+    rng = random.Random(seed)
+    max_strength, max_food, max_water = maxima
+    maps = [ArrayMap.generate(size, size, difficulty, seed=seed * 1000 + i)
+            for i, difficulty in enumerate(('easy', 'medium', 'hard') * 8)]
+    for _ in range(count):
+        game_map = rng.choice(maps)
+        player = Player(max_strength, max_water, max_food, vision_cls(), None,
+                        (rng.randrange(size), rng.randrange(size)))
+        player.current_strength = rng.randint(-1, 2 * max_strength) / 2
+        player.current_food = rng.randint(-1, 2 * max_food) / 2
+        player.current_water = rng.randint(-1, 2 * max_water) / 2
+        yield game_map, player
+
+
+def compile_brain(brain_name, vision_name, maxima=None, samples=20000, games=0, seed=0, cache_dir=None):
+    """
+    Return a CompiledBrain for BRAIN_CHOICES[brain_name] seeing through VISION_CHOICES[vision_name].
+    The table is loaded from the cache directory, unless the brain, vision or game code has
+    changed since it was saved (see code_version), topped up with samples random states and the
+    states met in `games` seeded games, and saved.
+    Small visions (cautious, focused) see few enough squares for most game states to be hits
+    after a few thousand games; the wider ones see too many combinations to gain much.
+    """
+    from wss.game import (BRAIN_CHOICES, VISION_CHOICES, PLAYER_MAX_STRENGTH, PLAYER_MAX_FOOD,
+                          PLAYER_MAX_WATER, simulate)
+
+    maxima = tuple(maxima or (PLAYER_MAX_STRENGTH, PLAYER_MAX_FOOD, PLAYER_MAX_WATER))
+    vision_cls = VISION_CHOICES[vision_name]
+    if vision_cls().whole_map:
+        raise ValueError("Visions that plan over the whole map can't be tabulated")
+    brain_cls = BRAIN_CHOICES[brain_name]
+
+    path = table_path(brain_name, vision_name, maxima, cache_dir)
+    table = DecisionTable.load(path, brain_name, vision_name, maxima, code_version(brain_cls, vision_cls))
+    compiled = CompiledBrain(brain_cls(), table)
+    for game_map, player in random_states(vision_cls, maxima, samples, seed):
+        player.brain = compiled
+        compiled.make_move(player, game_map)
+    if games and maxima == (PLAYER_MAX_STRENGTH, PLAYER_MAX_FOOD, PLAYER_MAX_WATER):
+        width, height = TRAINING_MAP_SIZE
+        for game_seed in range(seed, seed + games):
+            simulate(width, height, ('easy', 'medium', 'hard')[game_seed % 3], vision_name, compiled, game_seed)
+    table.save(path)
+    return compiled
+
+
+def verify(compiled, samples=5000, seed=1):
+    """
+    Check the table against the interpreted brain on samples random states (different from the
+    ones used to compile) and return the mismatches as (key, table action, brain action).
+    The table is not changed: states it hasn't seen are remembered for this check only, so
+    states sharing a key are always compared with each other; a mismatch means the key leaves
+    out something the brain uses.
+    """
+    from wss.game import VISION_CHOICES
+
+    table = compiled.table
+    vision_cls = VISION_CHOICES[table.vision_name]
+    brain_cls = type(compiled.brain)
+    unseen = {}   # key -> the brain's action, for keys missing from the table
+    mismatches = []
+    for game_map, player in random_states(vision_cls, table.maxima, samples, seed):
+        key = table.key(player, game_map)
+        expected = brain_cls().make_move(player, game_map)
+        stored = table.entries.get(key)
+        if stored is None:
+            stored = unseen.setdefault(key, expected)
+        if stored != expected:
+            mismatches.append((key, stored, expected))
+    return mismatches
@@ -0,0 +1,75 @@
+# events.py
+# Event sinks for simulation messages. Nothing is formatted or printed unless a sink is listening.
+from contextlib import contextmanager
+
+# Verbosity levels
+QUIET = 0
+INFO = 1      # turn status, chosen actions, game outcome
+DETAIL = 2    # move costs, brain reasoning, trade negotiation rounds
+
+# Highest level any attached sink listens to. Callers with several messages to build can
+# check `events.level >= DETAIL` once instead of paying for each emit() call.
+level = QUIET
+
+_sinks = []   # (level, sink) pairs
+
+
+def enabled(lvl):
+    return level >= lvl
+
+
+def emit(lvl, event, message, *args):
+    """
+    Send one message to every sink listening at lvl.
+    event is a short dotted name ('player.move', 'trade.round', ...) sinks can filter on;
+    message is a str.format template that is only filled in with args if some sink will receive it.
+    """
+    if level < lvl:
+        return
+    text = message.format(*args) if args else message
+    for sink_level, sink in _sinks:
+        if sink_level >= lvl:
+            sink.handle(lvl, event, text)
+
+
+@contextmanager
+def muted():
+    """Silence every sink inside the block, e.g. while a brain plays out turns that never happen"""
+    global level
+    saved = level
+    level = QUIET
+    try:
+        yield
+    finally:
+        level = saved
+
+
+def add_sink(sink, lvl=DETAIL):
+    """Attach a sink (any object with handle(level, event, text)) at the given verbosity"""
+    global level
+    _sinks.append((lvl, sink))
+    level = max(level, lvl)
+    return sink
+
+
+def remove_sink(sink):
+    global level
+    _sinks[:] = [(lvl, s) for lvl, s in _sinks if s is not sink]
+    level = max((lvl for lvl, _ in _sinks), default=QUIET)
+
+
+class ConsoleSink:
+    """Prints every message, reproducing the interactive game's console output"""
+
+    def handle(self, lvl, event, text):
+        print(text)
+
+
+class ListSink:
+    """Keeps (level, event, text) records in memory, e.g. to inspect one game in detail"""
+
+    def __init__(self):
+        self.records = []
+
+    def handle(self, lvl, event, text):
+        self.records.append((lvl, event, text))
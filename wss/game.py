@@ -1,5 +1,9 @@
 # Manages the setup and main game loop
+import argparse
+import random
 
+from . import events, profiling
+from .events import INFO, ConsoleSink, emit
 from .map import Map
 from .player import Player
 from .trader import Trader
@@ -46,7 +50,227 @@ DIRECTION_MAP = {
 }
 
 
-def main():
+# Default player stats for a new game
+PLAYER_MAX_STRENGTH = 10
+PLAYER_MAX_FOOD = 10
+PLAYER_MAX_WATER = 10
+
+# Safety cap for headless games (a player can rest on a repeating bonus forever)
+DEFAULT_MAX_TURNS = 10000
+
+
+class GameResult:
+    """Summary of a finished game, returned by play() and simulate()"""
+
+    def __init__(self, outcome, turns, player, seed=None):
+        self.outcome = outcome      # 'won', 'failed' or 'timeout'
+        self.turns = turns
+        self.location = player.location
+        self.strength = player.current_strength
+        self.food = player.current_food
+        self.water = player.current_water
+        self.gold = player.current_gold
+        self.seed = seed
+
+    @property
+    def won(self):
+        return self.outcome == 'won'
+
+    def as_dict(self):
+        return {
+            'outcome': self.outcome,
+            'turns': self.turns,
+            'x': self.location[0],
+            'y': self.location[1],
+            'strength': self.strength,
+            'food': self.food,
+            'water': self.water,
+            'gold': self.gold,
+            'seed': self.seed,
+        }
+
+    def __repr__(self):
+        return (f"GameResult({self.outcome}, turns={self.turns}, location={self.location}, "
+                f"strength={self.strength}, food={self.food}, water={self.water}, gold={self.gold})")
+
+
+def take_turn(game_map, player, turn, recorder=None):
+    """
+    Run one turn of the simulation loop.
+    Returns 'won' or 'failed' when the game ends this turn, otherwise None.
+    recorder (e.g. replay.ReplayWriter) is told the action, trade result and resource deltas.
+    While a profiling.TurnProfiler is active, each phase of the turn is timed.
+    """
+    prof = profiling.active
+    if recorder is None and prof is None:
+        return _run_turn(game_map, player, turn)[0]
+
+    if prof is not None:
+        prof.begin_turn()
+    before = (player.current_strength, player.current_food, player.current_water, player.current_gold)
+    outcome, action, traded = _run_turn(game_map, player, turn, prof)
+    if prof is not None:
+        prof.end_turn()
+    if recorder is not None:
+        recorder.record(turn, player, before, action, traded, outcome)
+    return outcome
+
+
+def _run_turn(game_map, player, turn, prof=None):
+    """Body of take_turn; returns (outcome, action, traded) where traded is None without a trader"""
+    traded = collect_items(game_map, player, turn, prof)
+    if prof is not None:
+        prof.mark('collect')
+
+    # Status
+    if events.level >= INFO:
+        x, y = player.location
+        emit(INFO, 'game.turn', "\nTurn {}: Location {} on {}", turn, player.location,
+             game_map.get_square(x, y).terrain.name)
+        emit(INFO, 'game.stats', "Stats -> Strength: {}, Food: {}, Water: {}, Gold: {}",
+             player.current_strength, player.current_food, player.current_water, player.current_gold)
+
+    # Win/Lose
+    outcome = check_outcome(game_map, player)
+    if prof is not None:
+        prof.mark('status')
+    if outcome:
+        return outcome, None, traded
+
+    # AI decision
+    action = player.brain.make_move(player, game_map)
+    emit(INFO, 'game.action', "Player action: {}", action)
+    if prof is not None:
+        prof.mark('decide', type(player.brain).__name__)
+
+    # Execute
+    execute_action(game_map, player, action)
+    if prof is not None:
+        prof.mark('act', 'rest' if action == 'rest' else 'move')
+    return None, action, traded
+
+
+def collect_items(game_map, player, turn, prof=None):
+    """Apply the bonuses on the player's square and trade with its traders; returns traded as in _run_turn"""
+    x, y = player.location
+    square = game_map.square_for_update(x, y)   # collecting and trading change its items
+    traded = None
+    for item in square.items:
+        if isinstance(item, Trader):
+            if prof is not None:
+                prof.mark('collect')
+            traded = player.trade_with(item, turn) or bool(traded)
+            if prof is not None:
+                prof.mark('trade', item.profile)
+        else:
+            applied = item.apply_to(player, turn)
+            if applied and not item.repeating:
+                game_map.remove_item(x, y, item)
+    return traded
+
+
+def check_outcome(game_map, player):
+    """'won' on the east edge, 'failed' once any resource is used up, otherwise None"""
+    if player.location[0] >= game_map.width - 1:
+        emit(INFO, 'game.won', "PLAYER WON: reached east edge!")
+        return 'won'
+    if player.current_strength <= 0 or player.current_food <= 0 or player.current_water <= 0:
+        emit(INFO, 'game.failed', "PLAYER FAILED: resources depleted.\nGAME OVER!")
+        return 'failed'
+    return None
+
+
+def execute_action(game_map, player, action):
+    """Carry out a brain's action; a blocked move or an unrecognized command is a rest"""
+    if action == 'rest':
+        player.rest()
+    else:
+        vec = DIRECTION_MAP.get(action)
+        if vec:
+            moved = player.move(vec, game_map)
+            if not moved:
+                player.rest()
+        else:
+            # Unrecognized command
+            player.rest()
+
+
+def play(game_map, player, max_turns=None, seed=None, recorder=None):
+    """
+    Run the simulation loop until the player wins, fails or max_turns is reached.
+    Messages go to whatever sinks are attached in wss.events; with none attached the game is silent.
+    seed is the seed game_map was generated from, if any; a recorder gets it in its header.
+    """
+    if recorder is not None:
+        recorder.start(game_map, player, seed)
+    turn = 1
+    while True:
+        outcome = take_turn(game_map, player, turn, recorder)
+        if outcome:
+            return GameResult(outcome, turn, player, seed)
+        if max_turns is not None and turn >= max_turns:
+            return GameResult('timeout', turn, player, seed)
+        turn += 1
+
+
+def new_player(vision, brain, height):
+    """Create a player with the default stats at the middle of the west edge"""
+    return Player(
+        max_strength=PLAYER_MAX_STRENGTH,
+        max_water=PLAYER_MAX_WATER,
+        max_food=PLAYER_MAX_FOOD,
+        vision=vision,
+        brain=brain,
+        location=(0, height // 2)
+    )
+
+
+def simulate(width, height, difficulty, vision, brain, seed=None, max_turns=DEFAULT_MAX_TURNS,
+             recorder=None):
+    """
+    Play one game without any input and return a GameResult.
+    Nothing is printed unless a sink is attached in wss.events.
+    vision and brain may be keys of VISION_CHOICES/BRAIN_CHOICES or instances.
+    The same seed always produces the same map and therefore the same game.
+    """
+    if isinstance(vision, str):
+        vision = VISION_CHOICES[vision]()
+    if isinstance(brain, str):
+        brain = BRAIN_CHOICES[brain]()
+
+    game_map = Map(width, height, difficulty, rng=random.Random(seed))
+    player = new_player(vision, brain, height)
+    return play(game_map, player, max_turns=max_turns, seed=seed, recorder=recorder)
+
+
+def profile_arguments(parser):
+    """Add the --profile options shared by the console and pygame front ends"""
+    parser.add_argument('--profile', action='store_true', help="time each phase of every turn and print a summary")
+    parser.add_argument('--profile-stacks', metavar='PATH',
+                        help="also write the timings as collapsed stacks for flamegraph tools")
+
+
+def start_profiling(args):
+    """Start a TurnProfiler if the command line asked for one"""
+    if args.profile or args.profile_stacks:
+        return profiling.start()
+    return None
+
+
+def finish_profiling(args, prof):
+    if prof is None:
+        return
+    profiling.stop()
+    print("\n" + prof.report())
+    if args.profile_stacks:
+        prof.write_collapsed(args.profile_stacks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play one interactive Wilderness Survival game in the console.")
+    profile_arguments(parser)
+    args = parser.parse_args(argv)
+
     print("=== Wilderness Survival System Simulation ===")
 
     # Map size and difficulty
@@ -76,64 +300,15 @@ def main():
     print("\nGenerated map:")
     game_map.display()
 
-    start_y = height // 2
-    player = Player(
-        max_strength=10,
-        max_water=10,
-        max_food=10,
-        vision=vision,
-        brain=brain,
-        location=(0, start_y)
-    )
-
-    turn = 1
-    # Simulation loop
-    while True:
-        x, y = player.location
-        square = game_map.get_square(x, y)
-
-        # Collect bonuses or trade
-        for item in square.items[:]:
-            if isinstance(item, Trader):
-                player.trade_with(item, turn)
-            else:
-                applied = item.apply_to(player, turn)
-                if applied and not item.repeating:
-                    square.remove_item(item)
-
-        # Status
-        print(f"\nTurn {turn}: Location {player.location} on {square.terrain.name}")
-        print(f"Stats -> Strength: {player.current_strength}, Food: {player.current_food}, "
-              f"Water: {player.current_water}, Gold: {player.current_gold}")
-
-        # Win/Lose
-        if player.location[0] >= width - 1:
-            print("PLAYER WON: reached east edge!")
-            break
+    player = new_player(vision, brain, height)
 
-        if player.current_strength <= 0 or player.current_food <= 0 or player.current_water <= 0:
-            print("PLAYER FAILED: resources depleted.")
-            print("GAME OVER!")
-            break
-
-        # AI decision
-        action = player.brain.make_move(player, game_map)
-        print(f"Player action: {action}")
-
-        # Execute
-        if action == 'rest':
-            player.rest()
-        else:
-            vec = DIRECTION_MAP.get(action)
-            if vec:
-                moved = player.move(vec, game_map)
-                if not moved:
-                    player.rest()
-            else:
-                # Unrecognized command
-                player.rest()
-
-        turn += 1
+    console = events.add_sink(ConsoleSink())
+    prof = start_profiling(args)
+    try:
+        play(game_map, player)
+    finally:
+        events.remove_sink(console)
+        finish_profiling(args, prof)
 
 
 if __name__ == '__main__':
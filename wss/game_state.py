@@ -0,0 +1,159 @@
+# game_state.py
+# Cheap copy-on-write snapshots of a game for lookahead: fork() shares everything a branch hasn't changed
+import copy
+
+from .array_map import SquareView
+from .game import take_turn
+from .square import Square
+
+_COUNTS = {'food': 'food_count', 'water': 'water_count', 'gold': 'gold_count', 'trader': 'trader_count'}
+
+
+class MapBranch:
+    """
+    A map that reads through to a base map (a Map, ArrayMap or ChunkedMap) until it changes a
+    square. square_for_update copies the square and its items (so consumed items,
+    Item.last_collected_turn and trader moods) the first time, and the branch owns that copy.
+    An ArrayMap square nothing has touched yet is built straight from the layers instead, so
+    the base doesn't materialize it; read_square does the same for code that only reads items.
+
+    fork() freezes the squares changed so far and shares them between the two branches; whichever
+    changes one of them next copies it again. Creating or forking a branch copies no squares,
+    only the dict of changed ones. The base itself must not be played on while branches of it
+    are in use.
+    """
+
+    def __init__(self, base, frozen=None):
+        self.base = base
+        self.width = base.width
+        self.height = base.height
+        self.difficulty = base.difficulty
+        self.revision = base.revision
+        self._frozen = frozen if frozen is not None else {}   # (x, y) -> Square shared with other branches
+        self._owned = {}                                       # (x, y) -> Square only this branch has
+
+    def fork(self):
+        """A branch with the same state as this one; the two change independently from now on"""
+        if self._owned:
+            self._frozen = {**self._frozen, **self._owned}
+            self._owned = {}
+        twin = MapBranch(self.base, self._frozen)
+        twin.revision = self.revision
+        return twin
+
+    def get_square(self, x, y):
+        square = self._owned.get((x, y)) or self._frozen.get((x, y))
+        if square is not None:
+            return square
+        return self.base.get_square(x, y)
+
+    def read_square(self, x, y):
+        """
+        The square at (x, y) with real items (Square.items), for code that reads them and changes
+        nothing. Where get_square would give an ArrayMap's SquareView, whose items materialize
+        the square in the base, this is a new Square built from the layers on every call.
+        """
+        square = self._owned.get((x, y)) or self._frozen.get((x, y)) or self.base.get_square(x, y)
+        if isinstance(square, SquareView):
+            return self.base.build_square(x, y)
+        return square
+
+    def square_for_update(self, x, y):
+        square = self._owned.get((x, y))
+        if square is None:
+            shared = self._frozen.get((x, y)) or self.base.get_square(x, y)
+            if shared is None:
+                return None
+            if isinstance(shared, SquareView):
+                square = self.base.build_square(x, y)   # already a copy of its own
+            else:
+                square = Square(x, y, shared.terrain)
+                for item in shared.items:
+                    square.add_item(copy.copy(item))
+            self._owned[(x, y)] = square
+        return square
+
+    def remove_item(self, x, y, item):
+        square = self.square_for_update(x, y)
+        if item not in square.items:
+            return
+        square.remove_item(item)
+        self.revision += 1
+
+    def is_valid_position(self, coords):
+        return self.base.is_valid_position(coords)
+
+    def changed_squares(self):
+        """Square for every coordinate this branch no longer reads from the base"""
+        return {**self._frozen, **self._owned}
+
+    def nearest_items(self, kind, x, y, k=1):
+        """
+        Like Map.nearest_items. Items are only ever removed during a game, so the base's answer
+        is right except for changed squares that have since run out of kind; asking the base
+        for that many more covers the ones that get dropped.
+        """
+        counter = _COUNTS[kind]
+        empty = {c for c, square in self.changed_squares().items() if not getattr(square, counter)}
+        if not empty:
+            return self.base.nearest_items(kind, x, y, k)
+        found = self.base.nearest_items(kind, x, y, k + len(empty))
+        return [c for c in found if c not in empty][:k]
+
+    def items_within(self, kind, x, y, radius):
+        counter = _COUNTS[kind]
+        changed = self.changed_squares()
+        return [c for c in self.base.items_within(kind, x, y, radius)
+                if c not in changed or getattr(changed[c], counter)]
+
+    def display(self):
+        for y in range(self.height):
+            print(" ".join(self.get_square(x, y).terrain.short_code() for x in range(self.width)))
+
+
+def stored_squares(game_map):
+    """
+    How many squares game_map keeps as Square objects (an ArrayMap's materialized ones; 0 for
+    other maps). Playing on branches must never change it.
+    """
+    return len(getattr(game_map, '_squares', ()))
+
+
+def fork_player(player):
+    """
+    Copy of player with its own resources and location. The brain is shared (the built-in
+    brains keep no state); the vision is copied so its snapshot cache follows this branch.
+    """
+    twin = copy.copy(player)
+    twin.vision = copy.copy(player.vision)
+    return twin
+
+
+class GameState:
+    """
+    A game in progress: the map, the player, the next turn and the outcome so far.
+    fork() is cheap enough to call thousands of times per decision: the new state shares every
+    square until it changes one, and copies only the player.
+    """
+
+    def __init__(self, game_map, player, turn=1, outcome=None):
+        self.game_map = game_map
+        self.player = player
+        self.turn = turn
+        self.outcome = outcome
+
+    def fork(self):
+        """
+        An independent copy of this state; both can be played on afterwards. The first fork
+        moves this state onto a MapBranch so the map it was created with is never changed.
+        """
+        if not isinstance(self.game_map, MapBranch):
+            self.game_map = MapBranch(self.game_map)
+        return GameState(self.game_map.fork(), fork_player(self.player), self.turn, self.outcome)
+
+    def take_turn(self):
+        """Play one turn with the player's brain; returns the outcome ('won', 'failed' or None)"""
+        if self.outcome is None:
+            self.outcome = take_turn(self.game_map, self.player, self.turn)
+            self.turn += 1
+        return self.outcome
@@ -0,0 +1,203 @@
+# lockstep.py
+# Plays many independent games at once: every player's state is a NumPy array and each turn is array operations
+import numpy as np
+
+from wss.array_map import ArrayMap, cost_tables
+from wss.game import (DIRECTION_MAP, DEFAULT_MAX_TURNS,
+                      PLAYER_MAX_STRENGTH, PLAYER_MAX_FOOD, PLAYER_MAX_WATER)
+from wss.map import FOOD_AMOUNT, WATER_AMOUNT, GOLD_AMOUNT
+
+# Action ids: rest, then the DIRECTION_MAP moves in order
+ACTIONS = ['rest'] + list(DIRECTION_MAP)
+REST = 0
+ACTION_DX = np.array([0] + [dx for dx, dy in DIRECTION_MAP.values()], dtype=np.int64)
+ACTION_DY = np.array([0] + [dy for dx, dy in DIRECTION_MAP.values()], dtype=np.int64)
+EAST = ACTIONS.index('MoveEast')
+NORTH_EAST = ACTIONS.index('MoveNorthEast')
+SOUTH_EAST = ACTIONS.index('MoveSouthEast')
+
+# Per-player outcome codes
+PLAYING, WON, FAILED, TIMEOUT = 0, 1, 2, 3
+OUTCOMES = [None, 'won', 'failed', 'timeout']
+
+# Player.rest
+REST_STRENGTH = 2
+REST_FOOD = 0.5
+REST_WATER = 0.5
+
+
+class LockstepGames:
+    """
+    N independent games advanced one turn at a time, all together.
+    Positions and resources are arrays indexed by player; the maps' terrain and water layers are
+    shared, while each player has its own copy of the one-time food and gold layers so that
+    what one player eats is still there for the others.
+
+    The turn follows game.take_turn: collect the bonuses on the current square, check for a
+    win or loss, ask the policy for an action, then move (if Player.can_enter allows it) or rest.
+    Traders are ignored. Trades are a negotiation between Python objects and have no array
+    form, so compare results against games on maps without traders.
+
+    A policy is a function policy(games, players) -> action ids (indices into ACTIONS) for the
+    given array of still-playing player indices. Brain objects can't be used directly; see
+    greedy_east_policy for one written against the arrays.
+    """
+
+    def __init__(self, maps, players=None, map_index=None, start=None,
+                 max_strength=PLAYER_MAX_STRENGTH, max_food=PLAYER_MAX_FOOD, max_water=PLAYER_MAX_WATER):
+        """
+        maps: Maps or ArrayMaps, all the same size
+        players: number of games (default one per map)
+        map_index: which map each player plays (default player i plays maps[i % len(maps)])
+        start: starting (x, y), the middle of the west edge by default as in game.new_player
+        """
+        layers = [m if isinstance(m, ArrayMap) and not m._squares else ArrayMap.from_map(m) for m in maps]
+        shapes = {(m.height, m.width) for m in layers}
+        if len(shapes) != 1:
+            raise ValueError("All maps must have the same width and height")
+        self.height, self.width = shapes.pop()
+
+        n = players if players is not None else len(layers)
+        if map_index is None:
+            map_index = np.arange(n) % len(layers)
+        self.map_index = np.asarray(map_index, dtype=np.int64)
+        if len(self.map_index) != n:
+            raise ValueError("map_index needs one entry per player")
+
+        self.terrain = np.stack([m.terrain for m in layers])        # (maps, height, width)
+        self.water_source = np.stack([m.water for m in layers]) > 0  # repeating, never consumed
+        # one-time bonuses, per player; a square holds at most one of each after generation
+        self.food_left = (np.stack([m.food for m in layers]) > 0)[self.map_index]
+        self.gold_left = (np.stack([m.gold for m in layers]) > 0)[self.map_index]
+
+        self.max_strength = max_strength
+        self.max_food = max_food
+        self.max_water = max_water
+        sx, sy = start if start is not None else (0, self.height // 2)
+        self.x = np.full(n, sx, dtype=np.int64)
+        self.y = np.full(n, sy, dtype=np.int64)
+        self.strength = np.full(n, max_strength, dtype=np.float64)
+        self.food = np.full(n, max_food, dtype=np.float64)
+        self.water = np.full(n, max_water, dtype=np.float64)
+        self.gold = np.zeros(n, dtype=np.float64)
+        self.outcome = np.full(n, PLAYING, dtype=np.int8)
+        self.turns = np.zeros(n, dtype=np.int64)   # turn the game ended on
+        self.turn = 1
+
+    def __len__(self):
+        return len(self.x)
+
+    def playing(self):
+        """Indices of the players whose game hasn't ended"""
+        return np.flatnonzero(self.outcome == PLAYING)
+
+    def step(self, policy):
+        """Play one turn for every unfinished game; returns how many are still playing"""
+        p = self.playing()
+        if not len(p):
+            return 0
+        x, y = self.x[p], self.y[p]
+        food = self.food[p]
+
+        # Collect bonuses, in the order they are placed on a square: food, water, gold.
+        # FoodBonus only counts (and is used up) if it raises food.
+        raised = np.minimum(self.max_food, food + FOOD_AMOUNT)
+        eat = self.food_left[p, y, x] & (raised > food)
+        food = np.where(eat, raised, food)
+        self.food_left[p[eat], y[eat], x[eat]] = False
+        # WaterBonus.apply_to credits food, not water; mirrored so results match game.play
+        springs = self.water_source[self.map_index[p], y, x]
+        food = np.where(springs, np.minimum(self.max_food, food + WATER_AMOUNT), food)
+        nuggets = self.gold_left[p, y, x]
+        self.gold[p] += nuggets * GOLD_AMOUNT
+        self.gold_left[p[nuggets], y[nuggets], x[nuggets]] = False
+        self.food[p] = food
+
+        # Win/Lose
+        won = x >= self.width - 1
+        failed = ~won & ((self.strength[p] <= 0) | (food <= 0) | (self.water[p] <= 0))
+        self.outcome[p[won]] = WON
+        self.outcome[p[failed]] = FAILED
+        self.turns[p[won | failed]] = self.turn
+
+        # Decide and execute
+        alive = ~(won | failed)
+        p, x, y = p[alive], x[alive], y[alive]
+        if len(p):
+            self._execute(p, x, y, np.asarray(policy(self, p), dtype=np.int64))
+        self.turn += 1
+        return len(p)
+
+    def _execute(self, p, x, y, actions):
+        nx = x + ACTION_DX[actions]
+        ny = y + ACTION_DY[actions]
+        inside = (actions != REST) & (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        t = self.terrain[self.map_index[p], np.clip(ny, 0, self.height - 1), np.clip(nx, 0, self.width - 1)]
+        move_costs, food_costs, water_costs = cost_tables()
+        move_cost, food_cost, water_cost = move_costs[t], food_costs[t], water_costs[t]
+
+        strength, food, water = self.strength[p], self.food[p], self.water[p]
+        # Player.can_enter; a blocked move is a rest, as in take_turn
+        moves = inside & (strength >= move_cost) & (food >= food_cost) & (water >= water_cost)
+        rests = ~moves
+
+        self.strength[p] = np.where(moves, strength - move_cost,
+                                    np.minimum(self.max_strength, strength + REST_STRENGTH))
+        self.food[p] = np.where(moves, food - food_cost, food - REST_FOOD)
+        self.water[p] = np.where(moves, water - water_cost, water - REST_WATER)
+        self.x[p] = np.where(rests, x, nx)
+        self.y[p] = np.where(rests, y, ny)
+
+    def run(self, policy, max_turns=DEFAULT_MAX_TURNS):
+        """Step until every game has ended or max_turns turns have been played; returns results()"""
+        while self.turn <= max_turns and self.step(policy):
+            pass
+        unfinished = self.playing()
+        self.outcome[unfinished] = TIMEOUT
+        self.turns[unfinished] = self.turn - 1
+        return self.results()
+
+    def results(self):
+        """Per-player arrays with the same fields as GameResult.as_dict()"""
+        return {
+            'outcome': self.outcome.copy(),
+            'turns': self.turns.copy(),
+            'x': self.x.copy(),
+            'y': self.y.copy(),
+            'strength': self.strength.copy(),
+            'food': self.food.copy(),
+            'water': self.water.copy(),
+            'gold': self.gold.copy(),
+        }
+
+    def win_rate(self):
+        return float(np.mean(self.outcome == WON))
+
+
+def east_policy(games, players):
+    """Always try to step east"""
+    return np.full(len(players), EAST, dtype=np.int64)
+
+
+def greedy_east_policy(games, players):
+    """
+    Rest when strength is low (as SurvivalBrain does), otherwise step to whichever of
+    east, north-east and south-east costs the least strength and can be afforded
+    (east wins ties); rest if none can.
+    """
+    x, y = games.x[players], games.y[players]
+    m = games.map_index[players]
+    strength, food, water = games.strength[players], games.food[players], games.water[players]
+    move_costs, food_costs, water_costs = cost_tables()
+    best = np.full(len(players), REST, dtype=np.int64)
+    best_cost = np.full(len(players), np.inf)
+    for action in (EAST, NORTH_EAST, SOUTH_EAST):
+        nx = x + ACTION_DX[action]
+        ny = y + ACTION_DY[action]
+        inside = (nx < games.width) & (ny >= 0) & (ny < games.height)
+        t = games.terrain[m, np.clip(ny, 0, games.height - 1), np.clip(nx, 0, games.width - 1)]
+        cost = move_costs[t]
+        ok = inside & (strength >= cost) & (food >= food_costs[t]) & (water >= water_costs[t]) & (cost < best_cost)
+        best = np.where(ok, action, best)
+        best_cost = np.where(ok, cost, best_cost)
+    return np.where(strength <= 2, REST, best)
@@ -1,16 +1,30 @@
 # main_pygame.py
 
+import argparse
 import sys
+import time
+
+import numpy as np
 import pygame
 
-from wss.item import WaterBonus, FoodBonus, GoldBonus
+from wss import events
+from wss.array_map import ArrayMap
+from wss.events import ConsoleSink
+from wss.game import finish_profiling, profile_arguments, start_profiling, take_turn
 from wss.map import Map
 from wss.player import Player
-from wss.trader import Trader
+from wss.terrain import TERRAIN_BY_ID
 from wss.brain import SurvivalBrain, RiskyBrain, ResourceBrain
 from wss.vision import CautiousVision, FocusedVision, KeenEyed, FarSight
 
 
+# --log choices
+LOG_LEVELS = {
+    'quiet': events.QUIET,
+    'info': events.INFO,
+    'detail': events.DETAIL,
+}
+
 # You can add more Brain subclasses to this dict as you implement them
 BRAIN_CHOICES = {
     'survival': SurvivalBrain,
@@ -26,18 +40,6 @@ VISION_CHOICES = {
     'far': FarSight,
 }
 
-# Convert Path direction strings into (dx, dy) vectors
-DIRECTION_MAP = {
-    "MoveNorth": (0, -1),
-    "MoveSouth": (0, 1),
-    "MoveEast": (1, 0),
-    "MoveWest": (-1, 0),
-    "MoveNorthEast": (1, -1),
-    "MoveNorthWest": (-1, -1),
-    "MoveSouthEast": (1, 1),
-    "MoveSouthWest": (-1, 1),
-}
-
 
 def choose_option(prompt, options):
     keys = list(options.keys())
@@ -75,80 +77,304 @@ def select_settings():
 
 CELL_SIZE = 48
 STATS_PANEL_HEIGHT = 100   # extra space at bottom
-FPS = 1  # AI moves per second
-
-
-def draw_map(screen, game_map):
-    colors = {
-        'plains': (200, 200, 150),
-        'forest': (34, 139, 34),
-        'desert': (237, 201, 175),
-        'swamp':  (47, 79, 47),
-        'mountain': (139, 137, 137),
-    }
-    for y in range(game_map.height):
-        for x in range(game_map.width):
-            terrain = game_map.get_square(x, y).terrain.name
-            col = colors.get(terrain, (180, 180, 180))
-            rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, col, rect)
-            pygame.draw.rect(screen, (50, 50, 50), rect, 1)
-
-
-def draw_items(screen, game_map):
-    for y in range(game_map.height):
-        for x in range(game_map.width):
-            sq = game_map.get_square(x, y)
-            cx = x*CELL_SIZE + CELL_SIZE//2
-            cy = y*CELL_SIZE + CELL_SIZE//2
-
-            # Draw water bonuses (blue)
-            if any(isinstance(i, WaterBonus) for i in sq.items):
-                pygame.draw.circle(screen, (64, 164, 223), (cx, cy), 6)
-
-            # Draw food bonuses (green)
-            if any(isinstance(i, FoodBonus) for i in sq.items):
-                pygame.draw.circle(screen, (34, 139, 34), (cx, cy), 6)
-
-            # Draw gold bonuses (yellow)
-            if any(isinstance(i, GoldBonus) for i in sq.items):
-                pygame.draw.circle(screen, (218, 165, 32), (cx, cy), 6)
-
-            # Draw traders (purple)
-            if any(isinstance(i, Trader) for i in sq.items):
-                pygame.draw.circle(screen, (128, 0, 128), (cx, cy), 8)
-
-
-def draw_player(screen, player):
-    x, y = player.location
-    pygame.draw.circle(screen, (220, 20, 60),
-        (x*CELL_SIZE+CELL_SIZE//2, y*CELL_SIZE+CELL_SIZE//2), CELL_SIZE//3)
-
-
-def draw_stats(screen, player, height, turn):
+RENDER_FPS = 30   # frames drawn per second
+
+# The window never grows past this; bigger maps scroll, and the wheel or PageUp/PageDown zoom
+MAX_VIEW_WIDTH = 1280
+MAX_VIEW_HEIGHT = 768
+ZOOM_LEVELS = [1, 2, 4, 8, 16, 24, 32, CELL_SIZE]   # cell sizes in pixels
+FOLLOW_MARGIN = 0.2   # recentre when the player is this share of the view from its edge
+GRID_MIN_CELL = 8     # smaller cells are drawn without grid lines
+ITEM_MIN_CELL = 8     # ... and without items
+GRID_COLOR = (50, 50, 50)
+PAN_KEYS = {pygame.K_w: (0, -1), pygame.K_a: (-1, 0), pygame.K_s: (0, 1), pygame.K_d: (1, 0)}   # F follows again
+MINIMAP_MAX_WIDTH = 240
+MINIMAP_HEIGHT = STATS_PANEL_HEIGHT - 20
+
+# Simulation speeds in turns per second (None = as fast as possible); Up/Down or +/- switch
+SPEEDS = [1, 2, 5, 10, 25, 100, 500, None]
+DEFAULT_SPEED = 1
+SIM_BUDGET = 0.8   # share of each frame the simulation may use before it yields to input and drawing
+
+
+# Terrain colors by name, and the color of terrains that aren't listed
+TERRAIN_COLORS = {
+    'plains': (200, 200, 150),
+    'forest': (34, 139, 34),
+    'desert': (237, 201, 175),
+    'swamp':  (47, 79, 47),
+    'mountain': (139, 137, 137),
+}
+OTHER_TERRAIN_COLOR = (180, 180, 180)
+
+
+def terrain_color(terrain):
+    return TERRAIN_COLORS.get(terrain.name, OTHER_TERRAIN_COLOR)
+
+
+def terrain_ids(game_map):
+    """The map's terrain ids as a height x width uint8 array"""
+    if isinstance(game_map, ArrayMap):
+        return game_map.terrain
+    return np.array([[game_map.get_square(x, y).terrain.id for x in range(game_map.width)]
+                     for y in range(game_map.height)], dtype=np.uint8)
+
+
+def build_terrain_image(game_map):
+    """
+    Render the terrain layer once, one pixel per cell; terrain never changes during a game.
+    The map view is this image scaled up, and the minimap is it scaled down.
+    """
+    # indexed by terrain id, built here so terrains registered after import are included
+    colors = np.array([terrain_color(t) for t in TERRAIN_BY_ID], dtype=np.uint8)
+    rgb = colors[terrain_ids(game_map)]          # height x width x 3
+    return pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+
+
+def build_minimap(terrain_image):
+    w, h = terrain_image.get_size()
+    scale = min(MINIMAP_MAX_WIDTH / w, MINIMAP_HEIGHT / h)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return pygame.transform.smoothscale(terrain_image.convert(24), size)
+
+
+class Camera:
+    """
+    The part of the map shown in the view: the top-left cell and the cell size in pixels.
+    While following, the camera recentres on the player only when they get within
+    FOLLOW_MARGIN of the view's edge, so most turns leave the view where it is.
+    """
+
+    def __init__(self, map_width, map_height, view_width, view_height, cell_size=CELL_SIZE):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.view_width = view_width      # pixels
+        self.view_height = view_height
+        self.cell_size = cell_size
+        self.x = 0
+        self.y = 0
+        self.following = True
+
+    @property
+    def columns(self):
+        """Whole columns that fit in the view"""
+        return max(1, self.view_width // self.cell_size)
+
+    @property
+    def rows(self):
+        return max(1, self.view_height // self.cell_size)
+
+    def shows_whole_map(self):
+        return self.columns >= self.map_width and self.rows >= self.map_height
+
+    def visible_range(self):
+        """(x0, y0, x1, y1): the cells at least partly in view, clipped to the map"""
+        cs = self.cell_size
+        return (self.x, self.y,
+                min(self.x + -(-self.view_width // cs), self.map_width),
+                min(self.y + -(-self.view_height // cs), self.map_height))
+
+    def is_visible(self, x, y):
+        x0, y0, x1, y1 = self.visible_range()
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def cell_rect(self, x, y):
+        cs = self.cell_size
+        return pygame.Rect((x - self.x) * cs, (y - self.y) * cs, cs, cs)
+
+    def _clamp(self):
+        self.x = max(0, min(self.x, self.map_width - self.columns))
+        self.y = max(0, min(self.y, self.map_height - self.rows))
+
+    def center_on(self, location):
+        x, y = location
+        self.x = x - self.columns // 2
+        self.y = y - self.rows // 2
+        self._clamp()
+
+    def follow(self, location):
+        """Recentre on location if it is near the edge of the view; returns True if the view moved"""
+        if not self.following:
+            return False
+        x, y = location
+        mx = int(self.columns * FOLLOW_MARGIN)
+        my = int(self.rows * FOLLOW_MARGIN)
+        if (self.x + mx <= x < self.x + self.columns - mx
+                and self.y + my <= y < self.y + self.rows - my):
+            return False
+        old = (self.x, self.y)
+        self.center_on(location)
+        return (self.x, self.y) != old
+
+    def pan(self, dx, dy):
+        """Move by a quarter view in the given direction and stop following the player"""
+        self.following = False
+        self.x += dx * max(1, self.columns // 4)
+        self.y += dy * max(1, self.rows // 4)
+        self._clamp()
+
+    def zoom(self, step, location):
+        """Step through ZOOM_LEVELS (positive zooms in), keeping location in view"""
+        levels = sorted(set(ZOOM_LEVELS) | {self.cell_size})
+        index = levels.index(self.cell_size) + step
+        self.cell_size = levels[max(0, min(index, len(levels) - 1))]
+        self.center_on(location)
+
+
+def draw_grid(screen, camera):
+    """One-pixel lines along the top and left edge of every cell in view"""
+    x0, y0, x1, y1 = camera.visible_range()
+    cs = camera.cell_size
+    bottom = (y1 - y0) * cs
+    right = (x1 - x0) * cs
+    for i in range(x1 - x0):
+        pygame.draw.line(screen, GRID_COLOR, (i * cs, 0), (i * cs, bottom - 1))
+    for j in range(y1 - y0):
+        pygame.draw.line(screen, GRID_COLOR, (0, j * cs), (right - 1, j * cs))
+
+
+def draw_view(screen, terrain_image, game_map, camera):
+    """Draw the cells in view: the scaled terrain image, then grid lines and items if they are big enough"""
+    x0, y0, x1, y1 = camera.visible_range()
+    cs = camera.cell_size
+    area = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+    screen.blit(pygame.transform.scale(terrain_image.subsurface(area), (area.w * cs, area.h * cs)), (0, 0))
+    if cs >= GRID_MIN_CELL:
+        draw_grid(screen, camera)
+    if cs >= ITEM_MIN_CELL:
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                draw_square_items(screen, game_map.get_square(x, y), camera.cell_rect(x, y))
+
+
+def draw_square_items(screen, sq, rect):
+    cx, cy = rect.center
+    small = max(1, rect.w // 8)
+    large = max(1, rect.w // 6)
+
+    # Draw water bonuses (blue)
+    if sq.has_water_bonus():
+        pygame.draw.circle(screen, (64, 164, 223), (cx, cy), small)
+
+    # Draw food bonuses (green)
+    if sq.has_food_bonus():
+        pygame.draw.circle(screen, (34, 139, 34), (cx, cy), small)
+
+    # Draw gold bonuses (yellow)
+    if sq.has_gold_bonus():
+        pygame.draw.circle(screen, (218, 165, 32), (cx, cy), small)
+
+    # Draw traders (purple)
+    if sq.has_trader():
+        pygame.draw.circle(screen, (128, 0, 128), (cx, cy), large)
+
+
+def draw_cell(screen, game_map, camera, x, y):
+    """Repaint one cell in view with its terrain and current items; returns the dirty rect"""
+    rect = camera.cell_rect(x, y)
+    sq = game_map.get_square(x, y)
+    screen.fill(terrain_color(sq.terrain), rect)
+    if rect.w >= GRID_MIN_CELL:
+        pygame.draw.line(screen, GRID_COLOR, rect.topleft, (rect.right - 1, rect.top))
+        pygame.draw.line(screen, GRID_COLOR, rect.topleft, (rect.left, rect.bottom - 1))
+    if rect.w >= ITEM_MIN_CELL:
+        draw_square_items(screen, sq, rect)
+    return rect
+
+
+PLAYER_COLOR = (220, 20, 60)
+
+
+def draw_player(screen, player, camera):
+    if not camera.is_visible(*player.location):
+        return
+    rect = camera.cell_rect(*player.location)
+    # The marker must stay inside the player's cell: only touched cells are repainted, so
+    # anything drawn past it would be left behind when the player moves on
+    if rect.w < 4:
+        screen.fill(PLAYER_COLOR, rect)   # too small for a circle
+        return
+    pygame.draw.circle(screen, PLAYER_COLOR, rect.center, min(max(2, rect.w // 3), (rect.w - 1) // 2))
+
+
+def draw_stats(screen, player, top, turn, speed=None):
     font = pygame.font.SysFont(None, 24)
     lines = [
-        f"Turn: {turn}",
+        f"Turn: {turn}" + (f"    Speed: {speed}" if speed else ""),
         f"Strength: {player.current_strength}/{player.max_strength}",
         f"Food:     {player.current_food:.1f}/{player.max_food}",
         f"Water:   {player.current_water:.1f}/{player.max_water}",
         f"Gold:    {player.current_gold}",
     ]
-    base_y = height*CELL_SIZE + 10   # start 10px into the stats panel
+    base_y = top + 10   # start 10px into the stats panel
     for i, text in enumerate(lines):
         surf = font.render(text, True, (230, 230, 230))
         screen.blit(surf, (10, base_y + i*18))
 
 
-def draw_stats_panel_background(screen, width, height):
-    panel_rect = pygame.Rect(
-        0, height*CELL_SIZE,
-        width*CELL_SIZE, STATS_PANEL_HEIGHT
-    )
+def draw_stats_panel_background(screen, view_width, view_height):
+    panel_rect = pygame.Rect(0, view_height, view_width, STATS_PANEL_HEIGHT)
     pygame.draw.rect(screen, (30, 30, 30), panel_rect)
+    return panel_rect
+
+
+def draw_minimap(screen, minimap, camera, player, panel_rect):
+    """Whole-map overview in the right of the stats panel, with the view outlined and the player marked"""
+    w, h = minimap.get_size()
+    left = panel_rect.right - w - 10
+    top = panel_rect.top + (panel_rect.h - h) // 2
+    screen.blit(minimap, (left, top))
+    sx = w / camera.map_width
+    sy = h / camera.map_height
+    view = pygame.Rect(left + int(camera.x * sx), top + int(camera.y * sy),
+                       max(2, round(camera.columns * sx)), max(2, round(camera.rows * sy)))
+    pygame.draw.rect(screen, (255, 255, 255), view.clip(pygame.Rect(left, top, w, h)), 1)
+    px, py = player.location
+    pygame.draw.circle(screen, (220, 20, 60), (left + int(px * sx), top + int(py * sy)), 2)
+
+
+def draw_result(screen, result, view_width, view_height):
+    font = pygame.font.SysFont(None, 48)
+    surf = font.render(result, True, (255, 0, 0))
+    rect = surf.get_rect(center=(view_width // 2, view_height // 2))
+    screen.blit(surf, rect)
+
+
+def run_turns(game_map, player, turn, count, deadline):
+    """
+    Advance the game by up to count turns (None for as many as fit), stopping early when the
+    game ends or time.perf_counter() passes deadline.
+    Returns (turns played, next turn number, outcome or None, squares the player stood on).
+    """
+    touched = {player.location}
+    played = 0
+    outcome = None
+    while count is None or played < count:
+        outcome = take_turn(game_map, player, turn)
+        touched.add(player.location)
+        played += 1
+        if outcome:
+            break
+        turn += 1
+        if time.perf_counter() >= deadline:
+            break
+    return played, turn, outcome, touched
+
 
+def speed_label(speed, paused):
+    if paused:
+        return "paused (N: step)"
+    return "uncapped" if speed is None else f"{speed} turns/s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch one Wilderness Survival game in a pygame window.")
+    profile_arguments(parser)
+    parser.add_argument('--log', choices=LOG_LEVELS, default='quiet',
+                        help="print the turn loop's messages to the console (default: quiet, which "
+                             "keeps printing from slowing down the fast speeds)")
+    args = parser.parse_args(argv)
 
-def main():
     # 1) initial settings
     width, height, difficulty, vision, brain = select_settings()
 
@@ -157,87 +383,127 @@ def main():
     start_y = height//2
     player = Player(25, 25, 25, vision, brain, (0, start_y))
 
+    # console output of the turn loop, as in the text version, if asked for
+    if LOG_LEVELS[args.log] > events.QUIET:
+        events.add_sink(ConsoleSink(), LOG_LEVELS[args.log])
+
     # 3) pygame init
     pygame.init()
+    view_width = min(width * CELL_SIZE, MAX_VIEW_WIDTH)
+    view_height = min(height * CELL_SIZE, MAX_VIEW_HEIGHT)
     screen = pygame.display.set_mode((
-        width * CELL_SIZE,
-        height * CELL_SIZE + STATS_PANEL_HEIGHT
+        view_width,
+        view_height + STATS_PANEL_HEIGHT
     ))
     clock = pygame.time.Clock()
     pygame.display.set_caption("Wilderness Survival AI")
+    terrain_image = build_terrain_image(game_map)
+    minimap = build_minimap(terrain_image)
+    camera = Camera(width, height, view_width, view_height)
+    camera.center_on(player.location)
+    prof = start_profiling(args)
 
     turn = 1
     running = True
     result = None
+    redraw_all = True   # first frame, window exposed, view moved, or game just ended
+
+    speed_index = SPEEDS.index(DEFAULT_SPEED)
+    paused = False
+    step_requested = False
+    pending = 0.0       # simulation time owed, in turns
 
     while running:
-        # --- handle quit only ---
+        frame_start = time.perf_counter()
+
+        # --- input: quit, window exposure, speed, stepping and the camera ---
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
                 running = False
-
-        x, y = player.location
-        square = game_map.get_square(x, y)
-
-        # --- AI step ---
+            elif ev.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                redraw_all = True
+            elif ev.type == pygame.MOUSEWHEEL and ev.y:
+                camera.zoom(1 if ev.y > 0 else -1, player.location)
+                redraw_all = True
+            elif ev.type == pygame.KEYDOWN:
+                if ev.key in (pygame.K_UP, pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    speed_index = min(speed_index + 1, len(SPEEDS) - 1)
+                elif ev.key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed_index = max(speed_index - 1, 0)
+                elif ev.key == pygame.K_SPACE:
+                    paused = not paused
+                elif ev.key in (pygame.K_n, pygame.K_RIGHT):
+                    paused = True
+                    step_requested = True
+                elif ev.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                    camera.zoom(1 if ev.key == pygame.K_PAGEUP else -1, player.location)
+                    redraw_all = True
+                elif ev.key in PAN_KEYS:
+                    camera.pan(*PAN_KEYS[ev.key])
+                    redraw_all = True
+                elif ev.key == pygame.K_f:
+                    camera.following = True
+                    camera.center_on(player.location)
+                    redraw_all = True
+                elif ev.key in (pygame.K_ESCAPE, pygame.K_q):
+                    running = False
+        speed = SPEEDS[speed_index]
+
+        # --- simulation: a fixed number of turns per second, independent of the frame rate ---
+        touched = ()
         if not result:
-            # collect/trade
-            sq = game_map.get_square(*player.location)
-            for item in sq.items[:]:
-                if isinstance(item, Trader):
-                    player.trade_with(item, turn)
-                else:
-                    applied = item.apply_to(player, turn)
-                    if applied and not item.repeating:
-                        sq.remove_item(item)
-
-            # Status
-            print(f"\nTurn {turn}: Location {player.location} on {square.terrain.name}")
-            print(f"Stats -> Strength: {player.current_strength}, Food: {player.current_food}, "
-                  f"Water: {player.current_water}, Gold: {player.current_gold}")
-
-            # check win/lose
-            if player.location[0] >= width - 1:
-                result = "YOU WIN!"
-                print("PLAYER WON: reached east edge!")
-            elif player.current_strength <= 0 or player.current_food <= 0 or player.current_water <= 0:
-                result = "GAME OVER"
-                print("PLAYER FAILED: resources depleted.")
-                print("GAME OVER!")
-
-            if not result:
-                action = player.brain.make_move(player, game_map)
-                print(f"Player action: {action}")
-                if action == 'rest':
-                    player.rest()
-                else:
-                    vec = DIRECTION_MAP.get(action)
-                    if vec and player.move(vec, game_map):
-                        pass
-                    else:
-                        player.rest()
-                turn += 1
-
-        # --- draw everything ---
-        screen.fill((0, 0, 0))
-        draw_map(screen, game_map)
-        draw_items(screen, game_map)
-        draw_player(screen, player)
-        # draw the stats panel
-        draw_stats_panel_background(screen, width, height)
-        draw_stats(screen, player, height, turn)
+            if paused:
+                count = 1 if step_requested else 0
+            elif speed is None:
+                count = None
+            else:
+                pending += clock.get_time() / 1000 * speed
+                count = int(pending)
+                pending -= count
+            step_requested = False
+
+            if count != 0:
+                # leave the rest of the frame for input and drawing
+                deadline = frame_start + SIM_BUDGET / RENDER_FPS
+                played, turn, outcome, touched = run_turns(game_map, player, turn, count, deadline)
+                if count is not None and played < count:
+                    pending = 0.0   # fell behind; don't try to catch up later
+                if outcome:
+                    result = "YOU WIN!" if outcome == 'won' else "GAME OVER"
+                    redraw_all = True
+        if camera.follow(player.location):
+            redraw_all = True
+
+        # --- draw: the whole view when it changed, otherwise only the cells that did ---
+        if redraw_all:
+            screen.fill((0, 0, 0))
+            draw_view(screen, terrain_image, game_map, camera)
+            dirty = None
+        else:
+            # items only disappear from squares the player stood on, so the cells the
+            # player passed through cover every change on the map
+            dirty = [draw_cell(screen, game_map, camera, x, y) for x, y in touched if camera.is_visible(x, y)]
+        draw_player(screen, player, camera)
+        # draw the stats panel, with a minimap when the map doesn't fit in the view
+        panel_rect = draw_stats_panel_background(screen, view_width, view_height)
+        draw_stats(screen, player, view_height, turn, speed_label(speed, paused))
+        if not camera.shows_whole_map():
+            draw_minimap(screen, minimap, camera, player, panel_rect)
 
         # if game over, overlay text
         if result:
-            font = pygame.font.SysFont(None, 48)
-            surf = font.render(result, True, (255, 0, 0))
-            rect = surf.get_rect(center=(width*CELL_SIZE // 2, height*CELL_SIZE // 2))
-            screen.blit(surf, rect)
+            draw_result(screen, result, view_width, view_height)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        if dirty is None:
+            pygame.display.flip()
+            redraw_all = False
+        else:
+            dirty.append(panel_rect)
+            pygame.display.update(dirty)
+        clock.tick(RENDER_FPS)
 
     pygame.quit()
+    finish_profiling(args, prof)
     sys.exit()
 
 
@@ -2,16 +2,29 @@
 import random
 
 from .item import WaterBonus, FoodBonus, GoldBonus
-from .square import Square
+from .spatial import build_resource_index
+from .square import Square, item_kind
 from .terrain import generate_terrain_for_difficulty
 from .trader import Trader, GenerousTrader, StingyTrader, FoodTrader, WaterTrader
 
+# Item placement odds and amounts (per square, west edge excluded)
+FOOD_CHANCE, FOOD_AMOUNT = 0.50, 5
+WATER_CHANCE, WATER_AMOUNT = 0.50, 3
+GOLD_CHANCE, GOLD_AMOUNT = 0.15, 2
+TRADER_CHANCE = 0.40
+TRADER_CLASSES = [GenerousTrader, StingyTrader, FoodTrader, WaterTrader]
+
 
 class Map:
-    def __init__(self, width, height, difficulty):
+    def __init__(self, width, height, difficulty, rng=None):
         self.width = width
         self.height = height
+        self.difficulty = difficulty
+        # Source of randomness for generation; pass random.Random(seed) for a reproducible map
+        self.rng = rng if rng is not None else random
         self.grid = [[None for _ in range(width)] for _ in range(height)]
+        self.revision = 0     # bumped whenever an item is removed
+        self._resources = None
 
         self.generate_map(difficulty)
         self.place_items()    # ← populate bonuses & traders here
@@ -19,7 +32,7 @@ class Map:
     def generate_map(self, difficulty):
         for y in range(self.height):
             for x in range(self.width):
-                terrain = generate_terrain_for_difficulty(difficulty)
+                terrain = generate_terrain_for_difficulty(difficulty, self.rng)
                 self.grid[y][x] = Square(x, y, terrain)
 
     def get_square(self, x, y):
@@ -27,6 +40,39 @@ class Map:
             return self.grid[y][x]
         return None
 
+    def square_for_update(self, x, y):
+        """The square at (x, y) for code that is about to change its items (see game_state.MapBranch)"""
+        return self.get_square(x, y)
+
+    def remove_item(self, x, y, item):
+        """
+        Remove a consumed item from the square at (x, y).
+        Goes through the map rather than the Square so caches keyed on revision notice the change.
+        """
+        square = self.get_square(x, y)
+        if item not in square.items:
+            return
+        square.remove_item(item)
+        self.revision += 1
+        kind = item_kind(type(item))
+        if kind and self._resources is not None:
+            self._resources.remove(kind, x, y)
+
+    @property
+    def resources(self):
+        """Spatial index of every item (see spatial.ResourceIndex), built on first use"""
+        if self._resources is None:
+            self._resources = build_resource_index(self)
+        return self._resources
+
+    def nearest_items(self, kind, x, y, k=1):
+        """Coordinates of the k squares holding `kind` ('food', 'water', 'gold', 'trader') closest to (x, y)"""
+        return self.resources.nearest(kind, x, y, k)
+
+    def items_within(self, kind, x, y, radius):
+        """Coordinates of squares holding `kind` at most radius moves from (x, y), closest first"""
+        return self.resources.within(kind, x, y, radius)
+
     def display(self):
         for row in self.grid:
             print(" ".join(square.terrain.short_code() for square in row))
@@ -41,31 +87,28 @@ class Map:
     def place_items(self):
         for y in range(self.height):
             for x in range(self.width):
-                square = self.grid[y][x]
-
                 # Skip the starting column (west edge) so players don't get freebies immediately
                 if x == 0:
                     continue
+                stock_square(self.grid[y][x], self.rng)
+
+
+def stock_square(square, rng):
+    """Roll the bonuses and trader for one square (four draws, plus one when a trader appears)"""
+    # One‐time food cache (50% chance)
+    if rng.random() < FOOD_CHANCE:
+        square.add_item(FoodBonus(amount=FOOD_AMOUNT, repeating=False))
+
+    # Repeating water source (like a stream) (50% chance)
+    if rng.random() < WATER_CHANCE:
+        square.add_item(WaterBonus(amount=WATER_AMOUNT, repeating=True))
+
+    # One‐time gold nugget (15% chance)
+    if rng.random() < GOLD_CHANCE:
+        square.add_item(GoldBonus(amount=GOLD_AMOUNT, repeating=False))
 
-                # One‐time food cache (50% chance)
-                if random.random() < 0.50:
-                    square.add_item(FoodBonus(amount=5, repeating=False))
-
-                # Repeating water source (like a stream) (50% chance)
-                if random.random() < 0.50:
-                    square.add_item(WaterBonus(amount=3, repeating=True))
-
-                # One‐time gold nugget (15% chance)
-                if random.random() < 0.15:
-                    square.add_item(GoldBonus(amount=2, repeating=False))
-
-                # Trader (40% chance)
-                if random.random() < 0.40:
-                    # pick one of the four trader classes
-                    TraderClass = random.choice([
-                        GenerousTrader,
-                        StingyTrader,
-                        FoodTrader,
-                        WaterTrader
-                    ])
-                    square.add_item(TraderClass())
+    # Trader (40% chance)
+    if rng.random() < TRADER_CHANCE:
+        # pick one of the four trader classes
+        TraderClass = rng.choice(TRADER_CLASSES)
+        square.add_item(TraderClass())
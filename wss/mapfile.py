@@ -0,0 +1,77 @@
+# mapfile.py
+# Single-file binary map format: a header followed by uint8 terrain-id and item-layer planes
+import struct
+
+import numpy as np
+
+from wss.array_map import ArrayMap, TRADER_KINDS, NO_TRADER
+
+MAGIC = b'WSSM'
+VERSION = 1
+
+# magic, version, width, height, difficulty id, plane count, offset of the first plane
+HEADER = struct.Struct('<4sHIIBBQ')
+DATA_OFFSET = 64   # planes start on a 64-byte boundary
+
+# planes in file order; each is height x width uint8, row-major
+PLANES = ('terrain', 'food', 'water', 'gold', 'trader')
+
+DIFFICULTIES = [None, 'easy', 'medium', 'hard']
+
+
+def _current_layers(game_map):
+    """The map's layers as they are now, with every touched square's items folded back in"""
+    if not isinstance(game_map, ArrayMap):
+        game_map = ArrayMap.from_map(game_map)
+    layers = [getattr(game_map, name) for name in PLANES]
+    if game_map._squares:
+        layers = [layer.copy() for layer in layers]
+        terrain, food, water, gold, trader = layers
+        for (x, y), square in game_map._squares.items():
+            food[y, x] = square.food_count
+            water[y, x] = square.water_count
+            gold[y, x] = square.gold_count
+            trader[y, x] = NO_TRADER
+            for item in square.items:
+                kind = TRADER_KINDS.get(type(item))
+                if kind:
+                    trader[y, x] = kind
+    return layers
+
+
+def save_map(game_map, path):
+    """Write a Map or ArrayMap (including consumed items) to path"""
+    layers = _current_layers(game_map)
+    difficulty = getattr(game_map, 'difficulty', None)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, game_map.width, game_map.height,
+                            DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0,
+                            len(PLANES), DATA_OFFSET))
+        f.write(b'\0' * (DATA_OFFSET - HEADER.size))
+        for layer in layers:
+            np.ascontiguousarray(layer, dtype=np.uint8).tofile(f)
+
+
+def load_map(path):
+    """
+    Open a map file as an ArrayMap backed by read-only memory maps, without copying anything.
+    Pages are only read from disk when a region is first looked at, and every process that
+    opens the same file shares them through the OS page cache. ArrayMap keeps consumed items
+    in its own touched squares, so the file is never written.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a WSS map file")
+    magic, version, width, height, difficulty, planes, offset = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a WSS map file")
+    if version != VERSION or planes != len(PLANES):
+        raise ValueError(f"Unsupported map file version {version}")
+
+    size = width * height
+    layers = [np.memmap(path, dtype=np.uint8, mode='r', offset=offset + i * size, shape=(height, width))
+              for i in range(planes)]
+    game_map = ArrayMap.from_layers(*layers)
+    game_map.difficulty = DIFFICULTIES[difficulty]
+    return game_map
@@ -0,0 +1,271 @@
+# mcts.py
+# Monte Carlo tree search brain: plays out many short futures per turn within a wall-clock budget
+import copy
+import math
+import random
+import time
+
+from wss import events
+from wss.brain import Brain, DIRECTION_VECTORS
+from wss.game import collect_items, check_outcome, execute_action
+from wss.game_state import GameState, fork_player, stored_squares
+from wss.player import Player
+from wss.trader import Trader
+
+ACTIONS = ('rest',) + tuple(DIRECTION_VECTORS)
+EAST_STEPS = ((1, 0), (1, -1), (1, 1))
+ALL_STEPS = tuple(DIRECTION_VECTORS.values())
+
+
+class Node:
+    """
+    A game state in the search tree, waiting for the player's decision: the turn's bonuses
+    have been collected and the player has neither won nor failed yet (unless outcome is set).
+    """
+    __slots__ = ('state', 'children', 'untried', 'visits', 'value')
+
+    def __init__(self, state, field=None):
+        self.state = state
+        self.children = {}   # action -> Node
+        self.untried = None if state.outcome else _actions(state, field)
+        self.visits = 0
+        self.value = 0.0
+
+
+def _actions(state, field=None):
+    """
+    The actions that lead to different states: rest, and every move onto the map the player
+    can afford (the game turns any other move into a rest). With a survivability field, moves
+    it shows to be doomed are left out as well.
+    """
+    player, game_map = state.player, state.game_map
+    x, y = player.location
+    actions = ['rest']
+    for action, (dx, dy) in DIRECTION_VECTORS.items():
+        square = game_map.get_square(x + dx, y + dy)
+        if square is not None and player.can_enter(square):
+            if field is None or not field.move_is_doomed(player, dx, dy):
+                actions.append(action)
+    return actions
+
+
+def _survives(player, square):
+    """Player.can_enter, and with strength, food and water all left over afterwards"""
+    t = square.terrain
+    return (player.current_strength > t.move_cost and
+            player.current_food > t.food_cost and
+            player.current_water > t.water_cost)
+
+
+def _key(player):
+    return (player.location, player.current_strength, player.current_food,
+            player.current_water, player.current_gold)
+
+
+class MCTSBrain(Brain):
+    """
+    Picks moves with UCT Monte Carlo tree search.
+    The tree is built from forked GameStates stepped with the game's own turn rules (bonuses,
+    trades, Player.move and rest), so it is exact. Below the tree, rollouts play a cheap
+    east-leaning random policy on one reused Player with can_enter, apply_terrain_costs, rest,
+    the bonuses' apply_to and initiate_trade. Nothing is copied there except a trader the
+    rollout actually meets, since trading changes its mood.
+    The search plans over the whole map, whatever the player's vision, and never changes it:
+    make_move raises RuntimeError if an ArrayMap gained materialized squares while it searched.
+
+    Each turn searches until time_budget seconds have passed (or max_iterations playouts, for
+    reproducible runs). The subtree under the chosen move is kept and becomes the next turn's
+    root when the game arrives at the state it predicted.
+
+    Given the map's survivability.SurvivabilityField, the tree never expands a move the field
+    shows to be doomed. The field's bounds stay valid as items are used up, since they only
+    ever count bonuses the player might still find.
+    """
+    pure_trade = True
+
+    def __init__(self, time_budget=0.05, max_iterations=None, horizon=10, exploration=1.0,
+                 east_bias=0.8, seed=None, field=None):
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.horizon = horizon
+        self.exploration = exploration
+        self.east_bias = east_bias
+        self.field = field            # survivability.SurvivabilityField of the map, to prune doomed moves
+        self.rng = random.Random(seed)
+        self.iterations = 0           # playouts in the last search
+        self._root = None
+        self._root_map = None
+        self._scratch = None          # the Player rollouts run on
+        self._eaten = set()           # (x, y, item index) of one-time bonuses used up in the current rollout
+        self._traders = {}            # (x, y, item index) of a trader -> the current rollout's copy of it
+
+    def make_move(self, player, game_map):
+        root = self._reusable_root(player, game_map)
+        if root is None:
+            root = Node(GameState(game_map, fork_player(player)), self.field)
+        stored = stored_squares(game_map)
+        with events.muted():
+            self._search(root)
+        if stored_squares(game_map) != stored:
+            raise RuntimeError("MCTS lookahead materialized squares in the map it was searching")
+
+        if not root.children:
+            return 'rest'
+        action, child = max(root.children.items(), key=lambda item: (item[1].visits, item[1].value))
+        self._root = child
+        self._root_map = game_map
+        return action
+
+    def decide_trade(self, trader, player, game_map):
+        # Only pay gold: food and water are what runs out, and gold is worth nothing else
+        offer, request = trader.default_offer()
+        if all(res == 'gold' for res in offer):
+            return offer, request
+        return None, None
+
+    def _reusable_root(self, player, game_map):
+        """Last turn's chosen subtree, if the game went where it predicted"""
+        root, self._root = self._root, None
+        if root is None or self._root_map is not game_map or root.state.outcome:
+            return None
+        if _key(root.state.player) != _key(player):
+            return None
+        return root
+
+    def _search(self, root):
+        deadline = time.perf_counter() + self.time_budget
+        limit = self.max_iterations
+        n = 0
+        while (n < limit) if limit is not None else (n == 0 or time.perf_counter() < deadline):
+            self._iterate(root)
+            n += 1
+        self.iterations = n
+
+    def _iterate(self, root):
+        # Selection
+        node = root
+        path = [node]
+        while not node.untried and node.children:
+            node = self._select(node)
+            path.append(node)
+
+        # Expansion
+        if node.untried:
+            action = node.untried.pop(self.rng.randrange(len(node.untried)))
+            child = Node(self._advance(node.state, action), self.field)
+            node.children[action] = child
+            node = child
+            path.append(node)
+
+        # Simulation
+        outcome = node.state.outcome
+        if outcome == 'won':
+            reward = 1.0
+        elif outcome == 'failed':
+            reward = 0.0
+        else:
+            reward = self._rollout(node.state)
+
+        # Backpropagation
+        for visited in path:
+            visited.visits += 1
+            visited.value += reward
+
+    def _select(self, node):
+        log_n = math.log(node.visits)
+        c = self.exploration
+        best, best_score = None, -1.0
+        for child in node.children.values():
+            score = child.value / child.visits + c * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _advance(self, state, action):
+        """The state after action: this turn's move or rest, then the next turn's collection and status"""
+        state = state.fork()
+        execute_action(state.game_map, state.player, action)
+        state.turn += 1
+        collect_items(state.game_map, state.player, state.turn)
+        state.outcome = check_outcome(state.game_map, state.player)
+        return state
+
+    def _rollout(self, state):
+        """
+        Play up to horizon turns with the rollout policy and score the result: 1 for reaching
+        the east edge, 0 for running out of anything, otherwise by progress and resources.
+        """
+        source = state.player
+        p = self._scratch
+        if p is None:
+            p = self._scratch = Player(source.max_strength, source.max_water, source.max_food,
+                                       None, self, source.location)
+        p.max_strength, p.max_food, p.max_water = source.max_strength, source.max_food, source.max_water
+        p.current_strength = source.current_strength
+        p.current_food = source.current_food
+        p.current_water = source.current_water
+        p.current_gold = source.current_gold
+
+        game_map = state.game_map   # a MapBranch: every state below the root has been forked
+        get_square = game_map.get_square
+        read_square = game_map.read_square
+        last_x = game_map.width - 1
+        rng = self.rng
+        east_bias = self.east_bias
+        eaten = self._eaten
+        eaten.clear()
+        traders = self._traders
+        traders.clear()
+        x, y = source.location
+        turn = state.turn
+
+        for _ in range(self.horizon):
+            # Act: try the east-facing steps in random order, now and then any step at all,
+            # but only steps that leave something of every resource; otherwise rest
+            moved = False
+            if rng.random() < east_bias:
+                first = rng.randrange(3)
+                for i in range(3):
+                    dx, dy = EAST_STEPS[(first + i) % 3]
+                    square = get_square(x + dx, y + dy)
+                    if square is not None and _survives(p, square):
+                        moved = True
+                        break
+            else:
+                dx, dy = ALL_STEPS[rng.randrange(8)]
+                square = get_square(x + dx, y + dy)
+                moved = square is not None and _survives(p, square)
+            if moved:
+                p.apply_terrain_costs(square)
+                x += dx
+                y += dy
+            else:
+                p.rest()
+            turn += 1
+
+            # Collect. read_square may build new item objects each time, so they are told
+            # apart by position
+            square = get_square(x, y)
+            if (square.has_food_bonus() or square.has_water_bonus() or square.has_gold_bonus()
+                    or square.has_trader()):
+                for i, item in enumerate(read_square(x, y).items):
+                    key = (x, y, i)
+                    if key in eaten:
+                        continue
+                    if isinstance(item, Trader):
+                        trader = traders.get(key)
+                        if trader is None:
+                            trader = traders[key] = copy.copy(item)
+                        trader.initiate_trade(p, turn)
+                    elif item.apply_to(p, turn) and not item.repeating:
+                        eaten.add(key)
+
+            # Status
+            if x >= last_x:
+                return 1.0
+            if p.current_strength <= 0 or p.current_food <= 0 or p.current_water <= 0:
+                return 0.0
+
+        health = min(p.current_strength / p.max_strength, p.current_food / p.max_food,
+                     p.current_water / p.max_water)
+        return 0.1 + 0.6 * x / last_x + 0.2 * health
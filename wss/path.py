@@ -1,5 +1,21 @@
 # path.py
 # represents a movement path with cost summary
+import heapq
+
+from wss import profiling
+from wss.terrain import TERRAIN_BY_ID
+
+# (dx, dy) -> direction name, the inverse of DIRECTION_VECTORS in brain.py
+STEP_DIRECTIONS = {
+    (0, -1): "MoveNorth",
+    (0, 1): "MoveSouth",
+    (1, 0): "MoveEast",
+    (-1, 0): "MoveWest",
+    (1, -1): "MoveNorthEast",
+    (-1, -1): "MoveNorthWest",
+    (1, 1): "MoveSouthEast",
+    (-1, 1): "MoveSouthWest",
+}
 
 class Path:
     def __init__(self, directions, start_position, end_position, movement_costs, food_costs, water_costs):
@@ -21,3 +37,100 @@ class Path:
         return (
             f"Path from {self.start_position} to {self.end_position}\n"
         )
+
+
+def min_move_cost():
+    """Cheapest move cost of any terrain, used to keep distance heuristics admissible"""
+    return min(t.move_cost for t in TERRAIN_BY_ID)
+
+
+def search(game_map, start, allowed=None, is_goal=None, heuristic=None, targets=None):
+    """
+    A* (Dijkstra when heuristic is None) over terrain move costs with 8-way moves.
+    Entering a square costs its terrain's move_cost.
+
+    allowed: set of coordinates the search may enter, or None for the whole map
+    is_goal: optional (x, y) -> bool; the search stops at the first goal it settles
+    heuristic: optional (x, y) -> admissible estimate of the remaining cost
+    targets: optional coordinates the search must settle; with is_goal it stops once it has
+             settled a goal and all of them, without it once it has settled all of them
+
+    Returns (costs, parents, goal): cost and predecessor of every settled square, and the goal
+    square that was reached (None without is_goal or when no goal is reachable).
+    """
+    if profiling.active is not None:
+        profiling.active.count('path.search')
+    costs = {start: 0}
+    parents = {start: None}
+    settled = set()
+    pending = None if targets is None else set(targets)
+    goal = None
+    counter = 0   # tie breaker so the heap never compares coordinates
+    heap = [(heuristic(*start) if heuristic else 0, 0, counter, start)]
+
+    while heap:
+        _, cost, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if pending:
+            pending.discard(node)
+        if goal is None and is_goal is not None and is_goal(*node):
+            goal = node
+        if not pending and (goal is not None or (is_goal is None and pending is not None)):
+            return costs, parents, goal
+
+        x, y = node
+        for dx, dy in STEP_DIRECTIONS:
+            nxt = (x + dx, y + dy)
+            if nxt in settled:
+                continue
+            if allowed is not None and nxt not in allowed:
+                continue
+            square = game_map.get_square(*nxt)
+            if square is None or not square.is_passable():
+                continue
+            new_cost = cost + square.terrain.move_cost
+            if new_cost < costs.get(nxt, float('inf')):
+                costs[nxt] = new_cost
+                parents[nxt] = node
+                counter += 1
+                estimate = new_cost + (heuristic(*nxt) if heuristic else 0)
+                heapq.heappush(heap, (estimate, new_cost, counter, nxt))
+
+    return costs, parents, goal
+
+
+def build_path(game_map, start, end, parents):
+    """Walk the parents map of search() back from end and return the Path, or None if unreached"""
+    if end == start or end not in parents:
+        return None
+    if profiling.active is not None:
+        profiling.active.count('path.built')
+
+    steps = []
+    node = end
+    while node != start:
+        steps.append(node)
+        node = parents[node]
+    steps.reverse()
+
+    directions = []
+    movement_costs, food_costs, water_costs = [], [], []
+    prev = start
+    for node in steps:
+        directions.append(STEP_DIRECTIONS[(node[0] - prev[0], node[1] - prev[1])])
+        t = game_map.get_square(*node).terrain
+        movement_costs.append(t.move_cost)
+        food_costs.append(t.food_cost)
+        water_costs.append(t.water_cost)
+        prev = node
+
+    return Path(
+        directions=directions,
+        start_position=start,
+        end_position=end,
+        movement_costs=movement_costs,
+        food_costs=food_costs,
+        water_costs=water_costs
+    )
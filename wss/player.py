@@ -1,4 +1,6 @@
 # player resource management and movement
+from wss import events
+from wss.events import DETAIL, emit
 
 class Player:
     def __init__(self, max_strength, max_water, max_food, vision, brain, location):
@@ -23,21 +25,19 @@ class Player:
         # 1. Boundary + existence check
         target = game_map.get_square(new_x, new_y)
         if not target:
-            print("Move blocked: off the map.")
+            emit(DETAIL, 'player.blocked', "Move blocked: off the map.")
             return False
 
-        t = target.terrain
-        print(
-            f"\nTarget terrain: {t.name} || costs: move={t.move_cost}, food={t.food_cost}, "
-            f"water={t.water_cost}")
-        print(
-            f"Your resources: strength={self.current_strength}, food={self.current_food}, "
-            f"water={self.current_water}")
-        # ← END DEBUG BLOCK
+        if events.level >= DETAIL:
+            t = target.terrain
+            emit(DETAIL, 'player.move', "\nTarget terrain: {} || costs: move={}, food={}, water={}",
+                 t.name, t.move_cost, t.food_cost, t.water_cost)
+            emit(DETAIL, 'player.move', "Your resources: strength={}, food={}, water={}",
+                 self.current_strength, self.current_food, self.current_water)
 
         # 2. Resource check
         if not self.can_enter(target):
-            print("\nMove blocked: insufficient resources for", target.terrain.name)
+            emit(DETAIL, 'player.blocked', "\nMove blocked: insufficient resources for {}", target.terrain.name)
             return False
 
         # 3. Deduct costs and update position
@@ -66,7 +66,7 @@ class Player:
         self.current_strength = min(self.max_strength, self.current_strength + 2)
         self.current_food -= 0.5
         self.current_water -= 0.5
-        print("Move blocked; Player rests instead.")
+        emit(DETAIL, 'player.rest', "Move blocked; Player rests instead.")
 
     def trade_with(self, trader, current_turn):
-        trader.initiate_trade(self, current_turn)
+        return trader.initiate_trade(self, current_turn)
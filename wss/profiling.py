@@ -0,0 +1,105 @@
+# profiling.py
+# Optional per-phase timing of the turn loop. Nothing is measured unless a TurnProfiler is active.
+import time
+
+# Phases of a turn, in the order game.take_turn runs them
+PHASES = ('collect', 'trade', 'status', 'decide', 'act')
+_PHASE_INDEX = {phase: i for i, phase in enumerate(PHASES)}
+
+# The profiler being fed, or None. Hot code reads this once and skips all measuring when it
+# is None, so the hooks can stay in place for production runs.
+active = None
+
+
+def start(profiler=None):
+    """Make profiler (a new TurnProfiler by default) the active one and return it"""
+    global active
+    active = profiler if profiler is not None else TurnProfiler()
+    return active
+
+
+def stop():
+    """Stop profiling and return the profiler that was active"""
+    global active
+    profiler, active = active, None
+    return profiler
+
+
+class TurnProfiler:
+    """
+    Time spent in each phase of every turn, plus event counters (vision queries, paths built, ...).
+    The turn loop calls begin_turn(), then mark(phase) at the end of each phase, then end_turn();
+    each mark charges the time since the previous one to that phase.
+    Work timed inside a phase (a vision snapshot during 'decide') is reported with child(), so
+    the collapsed stacks show it below the phase instead of counting it twice.
+    """
+
+    def __init__(self, keep_turns=True):
+        self.totals = dict.fromkeys(PHASES, 0.0)   # phase -> seconds over all turns
+        self.turns = [] if keep_turns else None    # per turn, a tuple of seconds in PHASES order
+        self.turn_count = 0
+        self.counters = {}
+        self.stacks = {}        # collapsed stack ('turn;decide;SurvivalBrain') -> seconds of self time
+        self._current = None
+        self._last = 0.0
+        self._children = []     # (name, seconds) timed since the last mark
+
+    def begin_turn(self):
+        self._current = [0.0] * len(PHASES)
+        self._children = []
+        self._last = time.perf_counter()
+
+    def mark(self, phase, detail=None):
+        """Charge the time since the previous mark to phase; detail adds a frame to its stack"""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self._current[_PHASE_INDEX[phase]] += elapsed
+        self.totals[phase] += elapsed
+
+        stack = f"turn;{phase};{detail}" if detail else f"turn;{phase}"
+        for name, seconds in self._children:
+            child = f"{stack};{name}"
+            self.stacks[child] = self.stacks.get(child, 0.0) + seconds
+            elapsed -= seconds
+        self._children = []
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed
+
+    def child(self, name, seconds):
+        self._children.append((name, seconds))
+
+    def end_turn(self):
+        self.turn_count += 1
+        if self.turns is not None:
+            self.turns.append(tuple(self._current))
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        """Summary table: total, share and per-turn mean/max of each phase, then the counters"""
+        total = sum(self.totals.values())
+        turns = max(self.turn_count, 1)
+        lines = [f"{self.turn_count} turns, {total * 1000:.1f} ms",
+                 f"{'phase':<10} {'total ms':>10} {'share':>7} {'mean us':>10} {'max us':>10}"]
+        for i, phase in enumerate(PHASES):
+            seconds = self.totals[phase]
+            worst = max((t[i] for t in self.turns), default=0.0) if self.turns is not None else float('nan')
+            lines.append(f"{phase:<10} {seconds * 1000:>10.2f} {seconds / total * 100 if total else 0:>6.1f}% "
+                         f"{seconds / turns * 1e6:>10.1f} {worst * 1e6:>10.1f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<24} {'total':>10} {'per turn':>10}")
+            for name in sorted(self.counters):
+                n = self.counters[name]
+                lines.append(f"{name:<24} {n:>10} {n / turns:>10.2f}")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path):
+        """
+        Write the stacks in collapsed format ('turn;decide;SurvivalBrain 1234' per line, in
+        microseconds), which flamegraph.pl, speedscope and similar tools read directly.
+        """
+        with open(path, 'w') as f:
+            for stack, seconds in sorted(self.stacks.items()):
+                f.write(f"{stack} {max(0, round(seconds * 1e6))}\n")
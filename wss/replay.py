@@ -0,0 +1,243 @@
+# replay.py
+# Compact binary game log: a header (seed or map snapshot) followed by one fixed-width record per turn
+import mmap
+import os
+import random
+import struct
+
+from wss.game import DIRECTION_MAP
+from wss.map import Map, TRADER_CLASSES
+
+MAGIC = b'WSSR'
+VERSION = 1
+
+# magic, version, flags, width, height, difficulty, seed, max strength/food/water,
+# start x/y, start strength/food/water/gold
+HEADER = struct.Struct('<4sHHIIBxxxqfffiiffff')
+
+# header flags
+FLAG_SEED = 1        # map is Map(width, height, difficulty, random.Random(seed))
+FLAG_SNAPSHOT = 2    # a width*height terrain-id plane and item plane follow the header
+
+# turn, action id, outcome id, trade id, x, y after the turn, strength/food/water/gold deltas
+RECORD = struct.Struct('<IBBBxiiffff')
+
+# Action ids: the DIRECTION_MAP vocabulary plus rest and two markers
+ACTIONS = ['rest'] + list(DIRECTION_MAP)
+ACTION_IDS = {name: i for i, name in enumerate(ACTIONS)}
+ACTION_UNKNOWN = 254   # the brain returned something outside the vocabulary (treated as rest)
+ACTION_NONE = 255      # the game ended before the brain was asked
+
+OUTCOMES = [None, 'won', 'failed']
+OUTCOME_IDS = {name: i for i, name in enumerate(OUTCOMES)}
+
+TRADE_NONE, TRADE_ACCEPTED, TRADE_DECLINED = 0, 1, 2
+
+DIFFICULTIES = [None, 'easy', 'medium', 'hard']
+
+# item plane bits: food, water, gold, then the trader kind (1 + index into TRADER_CLASSES)
+ITEM_FOOD, ITEM_WATER, ITEM_GOLD = 1, 2, 4
+TRADER_SHIFT = 3
+TRADER_KINDS = {cls: i + 1 for i, cls in enumerate(TRADER_CLASSES)}
+
+
+class TurnRecord:
+    """One decoded turn of a replay"""
+    __slots__ = ('turn', 'action', 'outcome', 'trade', 'location', 'deltas')
+
+    def __init__(self, turn, action_id, outcome_id, trade, x, y, ds, df, dw, dg):
+        self.turn = turn
+        if action_id == ACTION_NONE:
+            self.action = None
+        elif action_id == ACTION_UNKNOWN:
+            self.action = '?'
+        else:
+            self.action = ACTIONS[action_id]
+        self.outcome = OUTCOMES[outcome_id]
+        self.trade = trade
+        self.location = (x, y)
+        self.deltas = (ds, df, dw, dg)
+
+    def __repr__(self):
+        return (f"TurnRecord(turn={self.turn}, action={self.action}, outcome={self.outcome}, "
+                f"trade={self.trade}, location={self.location}, deltas={self.deltas})")
+
+
+def _snapshot_planes(game_map):
+    """Terrain-id plane and item-bit plane of a map, row by row"""
+    terrain = bytearray(game_map.width * game_map.height)
+    items = bytearray(game_map.width * game_map.height)
+    i = 0
+    for y in range(game_map.height):
+        for x in range(game_map.width):
+            square = game_map.get_square(x, y)
+            terrain[i] = square.terrain.id
+            bits = 0
+            if square.has_trader():
+                for item in square.items:
+                    kind = TRADER_KINDS.get(type(item))
+                    if kind:
+                        bits |= kind << TRADER_SHIFT
+            if square.has_food_bonus():
+                bits |= ITEM_FOOD
+            if square.has_water_bonus():
+                bits |= ITEM_WATER
+            if square.has_gold_bonus():
+                bits |= ITEM_GOLD
+            items[i] = bits
+            i += 1
+    return terrain, items
+
+
+def _fits_header(seed):
+    """True if seed can be stored in the header's int64 seed field"""
+    return isinstance(seed, int) and -2 ** 63 <= seed < 2 ** 63
+
+
+class ReplayWriter:
+    """
+    Recorder for game.play()/simulate(): writes the header on start() and one record per turn.
+    Seeded Maps only store the seed; any other map is stored as a terrain + item snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def start(self, game_map, player, seed=None):
+        # the header stores the seed as an int64; any other seed means storing the map itself
+        flags = FLAG_SEED if _fits_header(seed) and type(game_map) is Map else FLAG_SNAPSHOT
+        difficulty = getattr(game_map, 'difficulty', None)
+        self._file = open(self.path, 'wb')
+        try:
+            self._file.write(HEADER.pack(
+                MAGIC, VERSION, flags, game_map.width, game_map.height,
+                DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0,
+                seed if flags & FLAG_SEED else 0,
+                player.max_strength, player.max_food, player.max_water,
+                player.location[0], player.location[1],
+                player.current_strength, player.current_food, player.current_water, player.current_gold))
+            if flags & FLAG_SNAPSHOT:
+                terrain, items = _snapshot_planes(game_map)
+                self._file.write(terrain)
+                self._file.write(items)
+        except BaseException:
+            # don't leave a half-written replay behind
+            self.close()
+            os.remove(self.path)
+            raise
+
+    def record(self, turn, player, before, action, traded, outcome):
+        if action is None:
+            action_id = ACTION_NONE
+        else:
+            action_id = ACTION_IDS.get(action, ACTION_UNKNOWN)
+        trade = TRADE_NONE if traded is None else (TRADE_ACCEPTED if traded else TRADE_DECLINED)
+        x, y = player.location
+        self._file.write(RECORD.pack(
+            turn, action_id, OUTCOME_IDS[outcome], trade, x, y,
+            player.current_strength - before[0], player.current_food - before[1],
+            player.current_water - before[2], player.current_gold - before[3]))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Replay:
+    """
+    Read-only, memory-mapped view of a replay file.
+    Records are fixed width, so any turn is found by offset; state_at() rebuilds the player's
+    resources by summing the deltas, without re-running any Brain.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.flags, self.width, self.height, difficulty, seed,
+         self.max_strength, self.max_food, self.max_water, sx, sy,
+         s, f, w, g) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a WSS replay")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.seed = seed if self.flags & FLAG_SEED else None
+        self.start_location = (sx, sy)
+        self.start_resources = (s, f, w, g)
+
+        self._snapshot_offset = HEADER.size
+        offset = HEADER.size
+        if self.flags & FLAG_SNAPSHOT:
+            offset += 2 * self.width * self.height
+        self._records = memoryview(self._mmap)[offset:]
+        self.turns = len(self._records) // RECORD.size
+
+    def __len__(self):
+        return self.turns
+
+    def record(self, index):
+        """Decoded record number index (turn index + 1)"""
+        if not 0 <= index < self.turns:
+            raise IndexError(index)
+        return TurnRecord(*RECORD.unpack_from(self._records, index * RECORD.size))
+
+    def __iter__(self):
+        for fields in RECORD.iter_unpack(self._records[:self.turns * RECORD.size]):
+            yield TurnRecord(*fields)
+
+    def state_at(self, turn):
+        """
+        (location, (strength, food, water, gold)) at the end of the given turn;
+        turn 0 is the starting state.
+        """
+        if turn <= 0:
+            return self.start_location, self.start_resources
+        turn = min(turn, self.turns)
+        s, f, w, g = self.start_resources
+        for fields in RECORD.iter_unpack(self._records[:turn * RECORD.size]):
+            s += fields[6]
+            f += fields[7]
+            w += fields[8]
+            g += fields[9]
+        x, y = RECORD.unpack_from(self._records, (turn - 1) * RECORD.size)[4:6]
+        return (x, y), (s, f, w, g)
+
+    def final_outcome(self):
+        if not self.turns:
+            return None
+        return self.record(self.turns - 1).outcome or 'timeout'
+
+    def game_map(self):
+        """Rebuild the map as it was at the start of the game"""
+        if self.flags & FLAG_SEED:
+            return Map(self.width, self.height, self.difficulty, rng=random.Random(self.seed))
+
+        import numpy as np
+        from wss.array_map import ArrayMap
+
+        n = self.width * self.height
+        shape = (self.height, self.width)
+        start = self._snapshot_offset
+        # copies, so the map outlives close()
+        terrain = np.frombuffer(self._mmap, dtype=np.uint8, count=n, offset=start).reshape(shape).copy()
+        items = np.frombuffer(self._mmap, dtype=np.uint8, count=n, offset=start + n).reshape(shape)
+        game_map = ArrayMap.from_layers(
+            terrain,
+            (items & ITEM_FOOD).astype(np.uint8),
+            ((items & ITEM_WATER) >> 1).astype(np.uint8),
+            ((items & ITEM_GOLD) >> 2).astype(np.uint8),
+            (items >> TRADER_SHIFT).astype(np.uint8))
+        game_map.difficulty = self.difficulty
+        return game_map
+
+    def close(self):
+        self._records.release()
+        self._mmap.close()
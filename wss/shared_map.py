@@ -0,0 +1,140 @@
+# shared_map.py
+# Publishes a map's layers once in shared memory so worker processes can play on it without copies
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .array_map import ArrayMap
+
+LAYERS = ('terrain', 'food', 'water', 'gold', 'trader')
+
+
+class SharedMapHandle:
+    """Everything a worker needs to attach to a published map; small and cheap to pickle"""
+
+    def __init__(self, name, width, height, difficulty):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+
+    def __repr__(self):
+        return f"SharedMapHandle({self.name!r}, {self.width}x{self.height}, {self.difficulty})"
+
+
+class SharedLayers:
+    """
+    The five uint8 layers of an ArrayMap in one shared memory block, as read-only arrays.
+    Maps built by new_map() all read these arrays; each keeps its own consumed items and trader
+    moods in ArrayMap._squares, which only grows by the cells a game actually touches.
+    """
+
+    def __init__(self, shm, handle):
+        self.shm = shm
+        self.handle = handle
+        shape = (len(LAYERS), handle.height, handle.width)
+        stack = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        stack.flags.writeable = False
+        self.layers = tuple(stack)
+
+    def new_map(self):
+        """A fresh game on the shared layers: nothing consumed yet, no copies made"""
+        game_map = ArrayMap.from_layers(*self.layers)
+        game_map.difficulty = self.handle.difficulty
+        game_map.shared = self   # keeps the block mapped as long as the map is alive
+        return game_map
+
+    def close(self):
+        """Unmap the block in this process; maps from new_map() must not be used afterwards"""
+        self.layers = ()
+        self.shm.close()
+
+
+def publish(game_map, name=None):
+    """
+    Copy a Map's (or ArrayMap's) current terrain and items into a new shared memory block and
+    return its SharedLayers. The publishing process owns the block: call unlink() on its .shm
+    (or use publish_context) once every worker is done.
+    """
+    if not (isinstance(game_map, ArrayMap) and not game_map._squares):
+        game_map = ArrayMap.from_map(game_map)
+    size = len(LAYERS) * game_map.height * game_map.width
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    stack = np.ndarray((len(LAYERS), game_map.height, game_map.width), dtype=np.uint8, buffer=shm.buf)
+    for i, layer in enumerate(LAYERS):
+        stack[i] = getattr(game_map, layer)
+    del stack   # no exported views may outlive close()
+    handle = SharedMapHandle(shm.name, game_map.width, game_map.height, game_map.difficulty)
+    return SharedLayers(shm, handle)
+
+
+def attach(handle):
+    """Map the block published under handle in this process and return its SharedLayers"""
+    try:
+        shm = shared_memory.SharedMemory(name=handle.name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attach is registered with the resource tracker. Workers
+        # started by the publisher share its tracker, where that is a harmless duplicate; an
+        # unrelated process would have the block unlinked when it exits and should call
+        # resource_tracker.unregister(shm._name, 'shared_memory') itself.
+        shm = shared_memory.SharedMemory(name=handle.name)
+    return SharedLayers(shm, handle)
+
+
+class publish_context:
+    """with publish_context(game_map) as shared: ... -- closes and unlinks the block on exit"""
+
+    def __init__(self, game_map, name=None):
+        self.game_map = game_map
+        self.name = name
+        self.shared = None
+
+    def __enter__(self):
+        self.shared = publish(self.game_map, self.name)
+        return self.shared
+
+    def __exit__(self, *exc):
+        shm = self.shared.shm
+        try:
+            self.shared.close()
+        finally:
+            shm.unlink()
+        return False
+
+
+# The worker's attachment, made once per process by _init_worker
+_worker_layers = None
+
+
+def _init_worker(handle):
+    global _worker_layers
+    _worker_layers = attach(handle)
+
+
+def _play_on_shared(task):
+    """Worker entry point: one game on a fresh overlay of the shared layers"""
+    from wss.game import BRAIN_CHOICES, VISION_CHOICES, new_player, play
+
+    vision, brain, start_y, max_turns = task
+    game_map = _worker_layers.new_map()
+    player = new_player(VISION_CHOICES[vision](), BRAIN_CHOICES[brain](), game_map.height)
+    if start_y is not None:
+        player.location = (0, start_y)
+    return play(game_map, player, max_turns=max_turns).as_dict()
+
+
+def play_shared(game_map, tasks, workers=None, mp_context=None):
+    """
+    Play every (vision, brain, start_y, max_turns) task on game_map in a process pool and return
+    the GameResult.as_dict() of each, in order. The map is published once and every worker
+    attaches to it, so memory grows by the cells games touch, not by a map per worker.
+    start_y=None starts at the middle of the west edge, as game.new_player does.
+    With the 'spawn' context workers don't inherit the caller's own copy of the map at all.
+    """
+    workers = workers or os.cpu_count() or 1
+    with publish_context(game_map) as shared:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_init_worker,
+                                 initargs=(shared.handle,)) as executor:
+            return list(executor.map(_play_on_shared, tasks))
@@ -0,0 +1,137 @@
+# spatial.py
+# Bucketed spatial index of item coordinates for nearest-resource queries over the whole map
+
+RESOURCE_KINDS = ('food', 'water', 'gold', 'trader')
+
+
+def distance(x1, y1, x2, y2):
+    """Moves needed between two squares with 8-way movement (Chebyshev distance)"""
+    return max(abs(x1 - x2), abs(y1 - y2))
+
+
+class ResourceIndex:
+    """
+    Item coordinates per resource kind, grouped into square buckets of bucket_size cells.
+    Nearest-neighbour and radius queries only visit the buckets around the query point,
+    ring by ring, instead of scanning the whole grid.
+    """
+
+    def __init__(self, bucket_size=16):
+        self.bucket_size = bucket_size
+        # kind -> {(bucket_x, bucket_y): {(x, y): item count}}
+        self._buckets = {kind: {} for kind in RESOURCE_KINDS}
+        self._totals = {kind: 0 for kind in RESOURCE_KINDS}
+        self._cells = {kind: 0 for kind in RESOURCE_KINDS}   # distinct coordinates per kind
+
+    def add(self, kind, x, y, count=1):
+        key = (x // self.bucket_size, y // self.bucket_size)
+        cell = self._buckets[kind].setdefault(key, {})
+        if (x, y) not in cell:
+            self._cells[kind] += 1
+        cell[(x, y)] = cell.get((x, y), 0) + count
+        self._totals[kind] += count
+
+    def remove(self, kind, x, y, count=1):
+        buckets = self._buckets[kind]
+        key = (x // self.bucket_size, y // self.bucket_size)
+        cell = buckets.get(key)
+        if not cell or (x, y) not in cell:
+            return
+        remaining = cell[(x, y)] - count
+        self._totals[kind] -= min(count, cell[(x, y)])
+        if remaining > 0:
+            cell[(x, y)] = remaining
+        else:
+            del cell[(x, y)]
+            self._cells[kind] -= 1
+            if not cell:
+                del buckets[key]
+
+    def count(self, kind):
+        """Number of items of this kind in the index"""
+        return self._totals[kind]
+
+    def has(self, kind, x, y):
+        cell = self._buckets[kind].get((x // self.bucket_size, y // self.bucket_size))
+        return bool(cell) and (x, y) in cell
+
+    def _ring(self, kind, bx, by, r):
+        """Yield the non-empty buckets exactly r buckets away from (bx, by)"""
+        buckets = self._buckets[kind]
+        if r == 0:
+            cell = buckets.get((bx, by))
+            if cell:
+                yield cell
+            return
+        for x in range(bx - r, bx + r + 1):
+            for key in ((x, by - r), (x, by + r)):
+                cell = buckets.get(key)
+                if cell:
+                    yield cell
+        for y in range(by - r + 1, by + r):
+            for key in ((bx - r, y), (bx + r, y)):
+                cell = buckets.get(key)
+                if cell:
+                    yield cell
+
+    def nearest(self, kind, x, y, k=1, max_distance=None):
+        """
+        Up to k coordinates holding this kind of item, closest first (ties go to the eastmost).
+        max_distance optionally caps the search radius in moves.
+        """
+        total_cells = self._cells[kind]
+        size = self.bucket_size
+        bx, by = x // size, y // size
+        found = []
+        seen = 0
+        r = 0
+        while seen < total_cells:
+            for cell in self._ring(kind, bx, by, r):
+                seen += len(cell)
+                for (cx, cy) in cell:
+                    found.append((distance(x, y, cx, cy), -cx, cy))
+            # anything in a further ring is more than r * size moves away
+            reach = r * size
+            if max_distance is not None and reach >= max_distance:
+                break
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= reach:
+                    break
+            r += 1
+
+        found.sort()
+        if max_distance is not None:
+            found = [f for f in found if f[0] <= max_distance]
+        return [(-nx, ny) for _, nx, ny in found[:k]]
+
+    def within(self, kind, x, y, radius):
+        """All coordinates holding this kind of item at most radius moves away, closest first"""
+        size = self.bucket_size
+        bx, by = x // size, y // size
+        found = []
+        for r in range(radius // size + 2):
+            for cell in self._ring(kind, bx, by, r):
+                for (cx, cy) in cell:
+                    d = distance(x, y, cx, cy)
+                    if d <= radius:
+                        found.append((d, -cx, cy))
+        found.sort()
+        return [(-nx, ny) for _, nx, ny in found]
+
+
+def build_resource_index(game_map, bucket_size=16):
+    """Index every item on a Square-based map (one full scan)"""
+    index = ResourceIndex(bucket_size)
+    for y in range(game_map.height):
+        for x in range(game_map.width):
+            square = game_map.get_square(x, y)
+            if square.food_count:
+                index.add('food', x, y, square.food_count)
+            if square.water_count:
+                index.add('water', x, y, square.water_count)
+            if square.gold_count:
+                index.add('gold', x, y, square.gold_count)
+            if square.trader_count:
+                index.add('trader', x, y, square.trader_count)
+    return index
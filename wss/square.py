@@ -2,33 +2,86 @@
 from wss.item import FoodBonus, WaterBonus, GoldBonus
 from wss.trader import Trader
 
+# item class -> resource kind ('food', 'water', 'gold', 'trader' or None), filled in on first sight
+_KIND_FOR_TYPE = {}
+
+# resource kind -> name of the Square counter it updates
+_COUNTER_FOR_KIND = {
+    'food': 'food_count',
+    'water': 'water_count',
+    'gold': 'gold_count',
+    'trader': 'trader_count',
+}
+
+
+def item_kind(item_type):
+    """Resource kind of an item class, or None for items no index or counter tracks"""
+    try:
+        return _KIND_FOR_TYPE[item_type]
+    except KeyError:
+        pass
+    if issubclass(item_type, FoodBonus):
+        kind = 'food'
+    elif issubclass(item_type, WaterBonus):
+        kind = 'water'
+    elif issubclass(item_type, GoldBonus):
+        kind = 'gold'
+    elif issubclass(item_type, Trader):
+        kind = 'trader'
+    else:
+        kind = None
+    _KIND_FOR_TYPE[item_type] = kind
+    return kind
+
 
 class Square:
+    __slots__ = ('x', 'y', 'terrain', '_items', 'food_count', 'water_count', 'gold_count', 'trader_count')
+
     def __init__(self, x, y, terrain):
         self.x = x
         self.y = y
         self.terrain = terrain
-        self.items = []  # food, water, gold, or Trader
+        self._items = {}  # food, water, gold, or Trader -> None (insertion ordered, O(1) removal)
+        # per-type item counts kept up to date by add_item/remove_item
+        self.food_count = 0
+        self.water_count = 0
+        self.gold_count = 0
+        self.trader_count = 0
+
+    @property
+    def items(self):
+        """Items on this square, in the order they were added (a copy; use add_item/remove_item)"""
+        return tuple(self._items)
 
     def add_item(self, item):
-        self.items.append(item)
+        if item in self._items:
+            return
+        self._items[item] = None
+        kind = item_kind(type(item))
+        if kind:
+            counter = _COUNTER_FOR_KIND[kind]
+            setattr(self, counter, getattr(self, counter) + 1)
 
     def remove_item(self, item):
-        if item in self.items:
-            self.items.remove(item)
+        if item in self._items:
+            del self._items[item]
+            kind = item_kind(type(item))
+            if kind:
+                counter = _COUNTER_FOR_KIND[kind]
+                setattr(self, counter, getattr(self, counter) - 1)
 
     def is_passable(self):
         """Return True if the square can be entered. Always True unless you add impassable terrain."""
         return True
 
     def has_food_bonus(self):
-        return any(isinstance(i, FoodBonus) for i in self.items)
+        return self.food_count > 0
 
     def has_water_bonus(self):
-        return any(isinstance(i, WaterBonus) for i in self.items)
+        return self.water_count > 0
 
     def has_gold_bonus(self):
-        return any(isinstance(i, GoldBonus) for i in self.items)
+        return self.gold_count > 0
 
     def has_trader(self):
-        return any(isinstance(i, Trader) for i in self.items)
+        return self.trader_count > 0
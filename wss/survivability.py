@@ -0,0 +1,205 @@
+# survivability.py
+# Backward sweep from the east edge: the least strength, food and water each square needs to get there
+import random
+
+import numpy as np
+
+from wss.array_map import ArrayMap, TRADER_KINDS, cost_tables
+from wss.game import PLAYER_MAX_STRENGTH, PLAYER_MAX_FOOD, PLAYER_MAX_WATER
+from wss.map import Map, FOOD_AMOUNT, WATER_AMOUNT
+from wss.trader import FoodTrader, WaterTrader
+
+# Resources are whole or half units, so "more than nothing" means at least this much
+ALIVE = 0.5
+
+
+class SurvivabilityField:
+    """
+    Per square (arrays shaped (height, width), np.inf where the east edge is out of reach),
+    lower bounds on what a player standing there, with the square's bonuses collected, needs
+    to reach the east edge:
+
+    food:     food in hand. Food bonuses on the way count, and water sources (WaterBonus
+              credits food, as the game does) and food traders are places to fill up.
+    water:    water in hand. Only water traders give water back, so between them this is
+              the cheapest route's water cost.
+    strength: the strength the dearest step of the best route needs. Resting restores
+              strength, so this is compared with max_strength, not current_strength.
+
+    The bounds are optimistic on purpose: each resource is minimized on its own over routes in
+    all eight directions, one-time bonuses may count more than once, resting is free and every
+    trader is assumed to fill the player up (never mind the gold). So a player below any bound
+    is doomed, while a player above all three may still fail.
+    """
+
+    def __init__(self, game_map, max_strength=PLAYER_MAX_STRENGTH, max_food=PLAYER_MAX_FOOD,
+                 max_water=PLAYER_MAX_WATER):
+        layers = game_map if isinstance(game_map, ArrayMap) and not game_map._squares else ArrayMap.from_map(game_map)
+        self.height, self.width = layers.terrain.shape
+        self.max_strength = max_strength
+        self.max_food = max_food
+        self.max_water = max_water
+
+        move_costs, food_costs, water_costs = cost_tables()
+        self._move = move_costs[layers.terrain]
+        self._food_cost = food_costs[layers.terrain]
+        self._water_cost = water_costs[layers.terrain]
+        self._food_gain = (layers.food > 0) * float(FOOD_AMOUNT)
+        self._spring = layers.water > 0
+        # squares where the player can stay until food or water is full
+        self._food_refill = self._spring | (layers.trader == TRADER_KINDS[FoodTrader])
+        self._water_refill = layers.trader == TRADER_KINDS[WaterTrader]
+        self.strength, self.food, self.water = self._sweep()
+
+    def _sweep(self):
+        h, w = self.height, self.width
+        strength = np.full((h, w), np.inf)
+        food = np.full((h, w), np.inf)
+        water = np.full((h, w), np.inf)
+        strength[:, -1] = food[:, -1] = water[:, -1] = 0.0   # arriving there wins
+
+        # Sweep west through the columns (steps east), then back east (steps west), until a
+        # whole round changes nothing. Requirements only fall and are multiples of ALIVE, so
+        # this ends, at the fixed point over all eight directions: detours west to a spring,
+        # a trader or cheaper terrain are counted. Usually the second round settles it.
+        # A column is only worth updating from a neighbour that changed since it last looked.
+        fresh_east = [True] * w   # column changed since its west neighbour last read it
+        fresh_west = [True] * w   # column changed since its east neighbour last read it
+        changed = True
+        while changed:
+            changed = False
+            for x in range(w - 2, -1, -1):
+                if fresh_east[x + 1]:
+                    fresh_east[x + 1] = False
+                    if self._update_column(x, x + 1, strength, food, water):
+                        fresh_east[x] = fresh_west[x] = changed = True
+            for x in range(1, w - 1):
+                if fresh_west[x - 1]:
+                    fresh_west[x - 1] = False
+                    if self._update_column(x, x - 1, strength, food, water):
+                        fresh_east[x] = fresh_west[x] = changed = True
+        return strength, food, water
+
+    def _update_column(self, x, neighbour, strength, food, water):
+        """Improve column x through steps onto column neighbour and within x; True if anything fell"""
+        s, f, wa = self._via(neighbour, strength[:, neighbour], food[:, neighbour], water[:, neighbour],
+                             (-1, 0, 1))
+        s, f, wa = np.minimum(s, strength[:, x]), np.minimum(f, food[:, x]), np.minimum(wa, water[:, x])
+        f, wa = self._refill(x, f, wa)
+        # steps north and south inside the column, until nothing improves
+        for _ in range(self.height):
+            s2, f2, w2 = self._via(x, s, f, wa, (-1, 1))
+            f2, w2 = self._refill(x, f2, w2)
+            s2, f2, w2 = np.minimum(s, s2), np.minimum(f, f2), np.minimum(wa, w2)
+            if np.array_equal(s2, s) and np.array_equal(f2, f) and np.array_equal(w2, wa):
+                break
+            s, f, wa = s2, f2, w2
+        if np.array_equal(s, strength[:, x]) and np.array_equal(f, food[:, x]) and np.array_equal(wa, water[:, x]):
+            return False
+        strength[:, x], food[:, x], water[:, x] = s, f, wa
+        return True
+
+    def _arrival_needs(self, column, strength, food, water, alive):
+        """
+        What a player needs before stepping onto the squares of `column` (an index or a slice),
+        given their requirements after collecting; alive is what must be left on arrival.
+        """
+        # the step must be affordable, and what is left plus the bonuses must cover the rest
+        cost_f = self._food_cost[:, column]
+        cost_w = self._water_cost[:, column]
+        need_s = np.maximum(self._move[:, column] + alive, strength)
+        need_f = np.maximum(cost_f, np.maximum(food, alive) - self._food_gain[:, column] + cost_f)
+        need_w = np.maximum(water, alive) + cost_w
+        return need_s, need_f, need_w
+
+    def _refill(self, column, food, water):
+        """Where the player can fill up, holding just enough to stay alive is enough"""
+        food = np.where(self._food_refill[:, column] & np.isfinite(food), np.minimum(food, ALIVE), food)
+        water = np.where(self._water_refill[:, column] & np.isfinite(water), np.minimum(water, ALIVE), water)
+        return food, water
+
+    def _via(self, column, strength, food, water, offsets):
+        """
+        Requirements for every row of the square that steps onto `column` at row + offset
+        (a neighbouring column for offsets -1, 0 and 1, `column` itself for -1 and 1 alone),
+        given that column's own requirements after collecting.
+        """
+        # arriving on the east edge wins; anywhere else the player must still be alive
+        alive = 0.0 if column == self.width - 1 else ALIVE
+        need_s, need_f, need_w = self._arrival_needs(column, strength, food, water, alive)
+
+        best_s = np.full(self.height, np.inf)
+        best_f = np.full(self.height, np.inf)
+        best_w = np.full(self.height, np.inf)
+        for dy in offsets:
+            # row y steps to row y + dy
+            src, dst = _shifted(dy)
+            best_s[src] = np.minimum(best_s[src], need_s[dst])
+            best_f[src] = np.minimum(best_f[src], need_f[dst])
+            best_w[src] = np.minimum(best_w[src], need_w[dst])
+        # no one holds more than the maximum, so a larger requirement is out of reach
+        best_s[best_s > self.max_strength] = np.inf
+        best_f[best_f > self.max_food] = np.inf
+        best_w[best_w > self.max_water] = np.inf
+        return best_s, best_f, best_w
+
+    def need(self, x, y):
+        """(strength, food, water) bounds for square (x, y)"""
+        return self.strength[y, x], self.food[y, x], self.water[y, x]
+
+    def reachable(self, x, y):
+        """True if the east edge can be reached from (x, y) at all with the player's maxima"""
+        return bool(np.isfinite(self.strength[y, x]) and np.isfinite(self.food[y, x]) and np.isfinite(self.water[y, x]))
+
+    def can_finish(self, player):
+        """O(1): False when player, where it stands now, can't reach the east edge"""
+        x, y = player.location
+        return (player.max_strength >= self.strength[y, x] and
+                player.current_food >= self.food[y, x] and
+                player.current_water >= self.water[y, x])
+
+    def move_is_doomed(self, player, dx, dy):
+        """
+        O(1): True when stepping by (dx, dy) isn't possible or leaves player unable to reach
+        the east edge
+        """
+        x, y = player.location
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < self.width and 0 <= ny < self.height):
+            return True
+        if (player.current_strength < self._move[ny, nx] or player.current_food < self._food_cost[ny, nx]
+                or player.current_water < self._water_cost[ny, nx]):
+            return True   # not affordable: the game would make it a rest
+        food = min(self.max_food, player.current_food - self._food_cost[ny, nx] + self._food_gain[ny, nx])
+        if self._spring[ny, nx]:
+            food = min(self.max_food, food + WATER_AMOUNT)
+        water = player.current_water - self._water_cost[ny, nx]
+        return not (player.max_strength >= self.strength[ny, nx] and
+                    food >= self.food[ny, nx] and water >= self.water[ny, nx])
+
+
+def _shifted(d):
+    """(source, destination) slices pairing index i with i + d along one axis"""
+    if d > 0:
+        return slice(0, -d), slice(d, None)
+    if d < 0:
+        return slice(-d, None), slice(0, d)
+    return slice(None), slice(None)
+
+
+def winnable(game_map, start=None, **maxima):
+    """
+    Cheap check before playing a map: False when the start square (default the middle of the
+    west edge, as game.new_player) is doomed for a fresh player, so playing it can only end
+    in failure or a timeout.
+    """
+    field = SurvivabilityField(game_map, **maxima)
+    x, y = start if start is not None else (0, field.height // 2)
+    return (field.max_strength >= field.strength[y, x] and
+            field.max_food >= field.food[y, x] and field.max_water >= field.water[y, x])
+
+
+def winnable_seeds(width, height, difficulty, seeds):
+    """The seeds among `seeds` whose game.simulate map passes winnable()"""
+    return [seed for seed in seeds
+            if winnable(Map(width, height, difficulty, rng=random.Random(seed)))]
@@ -3,34 +3,74 @@ import random
 
 
 class Terrain:
-    def __init__(self, name, move_cost, food_cost, water_cost):
-        self.name = name
-        self.move_cost = move_cost
-        self.food_cost = food_cost
-        self.water_cost = water_cost
+    """
+    Immutable terrain type. Squares share one registered instance per type (see register_terrain),
+    so Terrain has __slots__ instead of a per-instance __dict__ and refuses attribute writes.
+    """
+    __slots__ = ('name', 'move_cost', 'food_cost', 'water_cost', 'id')
+
+    def __init__(self, name, move_cost, food_cost, water_cost, terrain_id=None):
+        set_attr = object.__setattr__
+        set_attr(self, 'name', name)
+        set_attr(self, 'move_cost', move_cost)
+        set_attr(self, 'food_cost', food_cost)
+        set_attr(self, 'water_cost', water_cost)
+        set_attr(self, 'id', terrain_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Terrain is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Terrain is immutable; cannot delete {name!r}")
+
+    def __reduce__(self):
+        # Registered terrains unpickle to the shared instance of the receiving process
+        if self.id is not None:
+            return get_terrain, (self.name,)
+        return Terrain, (self.name, self.move_cost, self.food_cost, self.water_cost)
+
+    def __repr__(self):
+        return f"Terrain({self.name!r}, {self.move_cost}, {self.food_cost}, {self.water_cost})"
 
     def short_code(self):
         return self.name[0].upper()
 
 
-def generate_terrain_for_difficulty(difficulty):
-    terrain_pool = {
-        "easy": [
-            Terrain("plains", 1, 1, 1),
-            Terrain("forest", 2, 2, 2),
-        ],
-        "medium": [
-            Terrain("plains", 1, 1, 1),
-            Terrain("forest", 2, 2, 2),
-            Terrain("swamp", 3, 3, 3),
-            Terrain("mountain", 4, 3, 2),
-        ],
-        "hard": [
-            Terrain("mountain", 4, 3, 2),
-            Terrain("desert", 3, 2, 5),
-            Terrain("swamp", 3, 3, 3),
-            Terrain("forest", 2, 2, 2),
-        ]
-    }
-
-    return random.choice(terrain_pool[difficulty])
+# name -> shared Terrain, and terrain id -> shared Terrain
+TERRAIN_REGISTRY = {}
+TERRAIN_BY_ID = []
+
+
+def register_terrain(name, move_cost, food_cost, water_cost):
+    """Return the shared Terrain for name, creating it with the next free integer id"""
+    terrain = TERRAIN_REGISTRY.get(name)
+    if terrain is not None:
+        if (terrain.move_cost, terrain.food_cost, terrain.water_cost) != (move_cost, food_cost, water_cost):
+            raise ValueError(f"Terrain {name!r} is already registered with different costs")
+        return terrain
+    terrain = Terrain(name, move_cost, food_cost, water_cost, len(TERRAIN_BY_ID))
+    TERRAIN_REGISTRY[name] = terrain
+    TERRAIN_BY_ID.append(terrain)
+    return terrain
+
+
+def get_terrain(name):
+    return TERRAIN_REGISTRY[name]
+
+
+PLAINS = register_terrain("plains", 1, 1, 1)
+FOREST = register_terrain("forest", 2, 2, 2)
+SWAMP = register_terrain("swamp", 3, 3, 3)
+MOUNTAIN = register_terrain("mountain", 4, 3, 2)
+DESERT = register_terrain("desert", 3, 2, 5)
+
+# Terrain types that can appear at each difficulty
+TERRAIN_POOLS = {
+    "easy": [PLAINS, FOREST],
+    "medium": [PLAINS, FOREST, SWAMP, MOUNTAIN],
+    "hard": [MOUNTAIN, DESERT, SWAMP, FOREST],
+}
+
+
+def generate_terrain_for_difficulty(difficulty, rng=random):
+    return rng.choice(TERRAIN_POOLS[difficulty])
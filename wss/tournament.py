@@ -0,0 +1,134 @@
+# tournament.py
+# Plays every brain x vision x difficulty combination over many seeded maps in parallel
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from wss.game import BRAIN_CHOICES, VISION_CHOICES, DEFAULT_MAX_TURNS, simulate
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Columns of the aggregated table / CSV
+RESULT_FIELDS = ('brain', 'vision', 'difficulty', 'games', 'win_rate',
+                 'mean_turns', 'mean_food', 'mean_water', 'mean_gold')
+
+
+def _play_chunk(task):
+    """
+    Worker entry point. A task only carries names and ints so pickling stays cheap;
+    every Map and Player is built inside the worker and returns as a few numbers.
+    """
+    brain, vision, difficulty, width, height, seeds, max_turns = task
+    wins = turns = food = water = gold = 0
+    for seed in seeds:
+        result = simulate(width, height, difficulty, vision, brain, seed, max_turns)
+        wins += result.won
+        turns += result.turns
+        food += result.food
+        water += result.water
+        gold += result.gold
+    return (brain, vision, difficulty), (len(seeds), wins, turns, food, water, gold)
+
+
+def _accumulate(totals, results):
+    for key, chunk in results:
+        acc = totals.setdefault(key, [0] * len(chunk))
+        for i, value in enumerate(chunk):
+            acc[i] += value
+
+
+def make_tasks(brains, visions, difficulties, width, height, seeds, chunk_size, max_turns):
+    """Split the seed list of every configuration into chunks of chunk_size games"""
+    tasks = []
+    for brain in brains:
+        for vision in visions:
+            for difficulty in difficulties:
+                for i in range(0, len(seeds), chunk_size):
+                    tasks.append((brain, vision, difficulty, width, height,
+                                  seeds[i:i + chunk_size], max_turns))
+    return tasks
+
+
+def run_tournament(width, height, games, brains=None, visions=None, difficulties=DIFFICULTIES,
+                   workers=None, chunk_size=None, first_seed=0, max_turns=DEFAULT_MAX_TURNS):
+    """
+    Play `games` seeded maps for every configuration and return one row (dict) per configuration.
+    Every configuration sees the same seeds, so they are compared on identical maps.
+    """
+    brains = list(brains or BRAIN_CHOICES)
+    visions = list(visions or VISION_CHOICES)
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(first_seed, first_seed + games))
+
+    configs = len(brains) * len(visions) * len(difficulties)
+    if chunk_size is None:
+        # a few chunks per worker keeps every core busy without paying per-game task overhead
+        chunk_size = max(1, min(games, configs * games // (workers * 4)))
+    tasks = make_tasks(brains, visions, difficulties, width, height, seeds, chunk_size, max_turns)
+
+    totals = {}
+    if workers == 1:
+        _accumulate(totals, map(_play_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _accumulate(totals, executor.map(_play_chunk, tasks))
+
+    rows = []
+    for (brain, vision, difficulty), (n, wins, turns, food, water, gold) in sorted(totals.items()):
+        rows.append({
+            'brain': brain,
+            'vision': vision,
+            'difficulty': difficulty,
+            'games': n,
+            'win_rate': wins / n,
+            'mean_turns': turns / n,
+            'mean_food': food / n,
+            'mean_water': water / n,
+            'mean_gold': gold / n,
+        })
+    return rows
+
+
+def print_table(rows, out=sys.stdout):
+    print(f"{'brain':<10} {'vision':<10} {'difficulty':<10} {'games':>6} {'win%':>7} "
+          f"{'turns':>8} {'food':>7} {'water':>7} {'gold':>7}", file=out)
+    for r in rows:
+        print(f"{r['brain']:<10} {r['vision']:<10} {r['difficulty']:<10} {r['games']:>6} "
+              f"{r['win_rate'] * 100:>6.1f}% {r['mean_turns']:>8.1f} {r['mean_food']:>7.2f} "
+              f"{r['mean_water']:>7.2f} {r['mean_gold']:>7.2f}", file=out)
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a brain x vision x difficulty tournament.")
+    parser.add_argument('--width', type=int, default=30)
+    parser.add_argument('--height', type=int, default=15)
+    parser.add_argument('--games', type=int, default=100, help="seeded maps per configuration")
+    parser.add_argument('--brains', nargs='+', choices=list(BRAIN_CHOICES))
+    parser.add_argument('--visions', nargs='+', choices=list(VISION_CHOICES))
+    parser.add_argument('--difficulties', nargs='+', choices=DIFFICULTIES, default=list(DIFFICULTIES))
+    parser.add_argument('--workers', type=int, default=None, help="default: all cores")
+    parser.add_argument('--chunk-size', type=int, default=None, help="games per worker task")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument('--csv', help="also write the results to this CSV file")
+    args = parser.parse_args(argv)
+
+    rows = run_tournament(args.width, args.height, args.games, args.brains, args.visions,
+                          args.difficulties, args.workers, args.chunk_size, args.first_seed,
+                          args.max_turns)
+    print_table(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 # wss/trader.py
 # Automated Trader logic without user prompts, suitable for AI-driven trades
+from . import events, negotiation
+from .events import DETAIL, INFO, emit
 from .item import Item
 
 
@@ -8,6 +10,7 @@ class Trader(Item):
         super().__init__(repeating=repeating)
         self.counter_offer_count = 0
         self.profile = profile
+        self.last_trade = None   # (offer, request) of the last accepted trade
 
     def default_offer(self):
         # Returns the initial trade proposal as a tuple:
@@ -58,49 +61,60 @@ class Trader(Item):
         return None
 
     def initiate_trade(self, player, current_turn=None, game_map=None):
-        print(f"\n--- Negotiation with {self.profile.title()}Trader ---")
-        print(f"Player pre-trade resources: Str={player.current_strength}, "
-              f"Food={player.current_food}, Water={player.current_water}, Gold={player.current_gold}")
+        # Unless someone is following the rounds, a brain whose decisions depend only on the
+        # offer and its resources gets the memoized outcome of the same negotiation
+        if events.level < DETAIL and negotiation.memoizable(player.brain):
+            return negotiation.settle(self, player, game_map)
+        return self.negotiate(player, game_map)
+
+    def negotiate(self, player, game_map=None):
+        """Run the negotiation round by round; returns True if a trade was made"""
+        if events.level >= DETAIL:
+            emit(DETAIL, 'trade.start', "\n--- Negotiation with {}Trader ---", self.profile.title())
+            emit(DETAIL, 'trade.start', "Player pre-trade resources: Str={}, Food={}, Water={}, Gold={}",
+                 player.current_strength, player.current_food, player.current_water, player.current_gold)
 
         offer, request = self.default_offer()
         round = 0
 
         while True:
             round += 1
-            print(f"[Round {round}] Trader offers {offer}  →  Player would receive {request}")
+            emit(DETAIL, 'trade.round', "[Round {}] Trader offers {}  →  Player would receive {}",
+                 round, offer, request)
 
             # ask the brain how to respond
             choice_offer, choice_request = player.brain.decide_trade(self, player, game_map)
             if choice_offer is None:
-                print("Player declines to negotiate further.")
+                emit(DETAIL, 'trade.declined', "Player declines to negotiate further.")
                 return False
 
             # if choice matches the trader’s current proposal, accept it
             if choice_offer == offer and choice_request == request:
                 # check affordability
                 if any(getattr(player, f"current_{res}") < amt for res, amt in offer.items()):
-                    print("Player can't afford that offer; trade cancelled.")
+                    emit(DETAIL, 'trade.cancelled', "Player can't afford that offer; trade cancelled.")
                     return False
 
                 # execute the swap
+                self.last_trade = (offer, request)
                 for res, amt in offer.items():
                     setattr(player, f"current_{res}", getattr(player, f"current_{res}") - amt)
                 for res, amt in request.items():
                     setattr(player, f"current_{res}", getattr(player, f"current_{res}") + amt)
 
-                print("Trade accepted!")
-                print(f"Post-trade resources: Str={player.current_strength}, "
-                      f"Food={player.current_food}, Water={player.current_water}, Gold={player.current_gold}")
+                emit(INFO, 'trade.accepted', "Trade accepted!")
+                emit(DETAIL, 'trade.accepted', "Post-trade resources: Str={}, Food={}, Water={}, Gold={}",
+                     player.current_strength, player.current_food, player.current_water, player.current_gold)
                 return True
 
             # otherwise, generate a counter-offer
             counter = self.counter_offer((offer, request))
             if not counter:
-                print("Trader is offended by haggling and walks away.")
+                emit(DETAIL, 'trade.walked_away', "Trader is offended by haggling and walks away.")
                 return False
 
             offer, request = counter
-            print(f"Trader counters with {offer} → {request}")
+            emit(DETAIL, 'trade.counter', "Trader counters with {} → {}", offer, request)
 
 
 class GenerousTrader(Trader):
@@ -1,220 +1,237 @@
 # player sight and scanning surrounding squares
 # vision.py
-from wss.path import Path
+import time
+
+from wss import profiling
+from wss.chunked_map import ChunkedMap
+from wss.path import STEP_DIRECTIONS, Path, search, build_path, min_move_cost
+
+DIRECTION_STEPS = {direction: step for step, direction in STEP_DIRECTIONS.items()}
+
+
+class VisibilitySnapshot:
+    """
+    Everything a turn's worth of Vision queries needs, computed once: the visible squares,
+    one Dijkstra search over the search area, and the reachable visible squares sorted into
+    food, water, gold, trader and passable buckets in a single pass.
+    With no search area (whole_map) the search stops once every passable visible square is
+    settled instead of flooding the map.
+    """
+
+    def __init__(self, vision, game_map, player):
+        self.game_map = game_map
+        self.start = player.location
+        self.visible = vision.get_visible_squares(game_map, player)
+        area = vision._search_area(game_map, player, self.visible)
+        targets = None
+        if area is None:
+            targets = [c for c in self.visible if game_map.get_square(*c).is_passable()]
+        self.costs, self.parents, _ = search(game_map, self.start, area, targets=targets)
+        self.food, self.water, self.gold, self.traders, self.passable = [], [], [], [], []
+        self._paths = {}
+
+        for coords in self.visible:
+            if coords not in self.parents:
+                continue  # unreachable through the search area
+            square = game_map.get_square(*coords)
+            if square.is_passable():
+                self.passable.append(coords)
+            if square.has_food_bonus():
+                self.food.append(coords)
+            if square.has_water_bonus():
+                self.water.append(coords)
+            if square.has_gold_bonus():
+                self.gold.append(coords)
+            if square.has_trader():
+                self.traders.append(coords)
+
+    def path_to(self, coords):
+        """Path from the player to coords, built on first request"""
+        path = self._paths.get(coords)
+        if path is None:
+            path = build_path(self.game_map, self.start, coords, self.parents)
+            self._paths[coords] = path
+        return path
+
+    def nearest(self, targets, rank=0):
+        """The rank-th closest target: fewest steps, then movement cost, then furthest east"""
+        paths = [p for p in map(self.path_to, targets) if p]
+        if len(paths) <= rank:
+            return None
+        paths.sort(key=lambda p: (
+            len(p.directions),
+            p.total_cost()['movement'],
+            -p.end_position[0]  # negative to prioritize eastward positions
+        ))
+        return paths[rank]
+
+
+def _check_whole_map(game_map, what):
+    """Raise TypeError for maps that can't be searched as a whole: a ChunkedMap would generate every chunk"""
+    if isinstance(getattr(game_map, 'base', game_map), ChunkedMap):
+        raise TypeError(f"{what} searches the whole map, which a ChunkedMap only generates "
+                        f"chunk by chunk; use a sight-limited vision")
 
 
 class Vision:
     """Base Vision class for looking at neighboring squares"""
 
+    def __init__(self, whole_map=False):
+        # Paths may only cross visible squares unless whole_map is set, in which case
+        # they are planned over the whole known map
+        self.whole_map = whole_map
+        self._snapshot = None
+        self._snapshot_key = None
+        self._east_plan = None   # (map, squares along it, Path) of the last whole-map easiest_path
+
     def get_visible_squares(self, game_map, player):
         """Returns a list of visible square coordinates - implemented by subclasses"""
         raise NotImplementedError
 
+    def snapshot(self, game_map, player):
+        """
+        Return the VisibilitySnapshot for the player's current position.
+        It is reused until the player moves or the map's items change (Map.revision).
+        """
+        key = (player.location, game_map.revision)
+        snap = self._snapshot
+        prof = profiling.active
+        if prof is not None:
+            prof.count('vision.query')
+        if snap is None or snap.game_map is not game_map or self._snapshot_key != key:
+            if prof is None:
+                snap = VisibilitySnapshot(self, game_map, player)
+            else:
+                start = time.perf_counter()
+                snap = VisibilitySnapshot(self, game_map, player)
+                prof.child(f"{type(self).__name__}.snapshot", time.perf_counter() - start)
+                prof.count('vision.snapshot')
+            self._snapshot = snap
+            self._snapshot_key = key
+        return snap
+
     def closest_food(self, game_map, player):
         """Find the closest square with food bonus"""
-        food_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    food_paths.append(path)
-
-        if not food_paths:
-            return None  # no food found
-
-        # sort paths by distance, then movement cost, then eastward position
-        food_paths.sort(key=lambda p: (
-            len(p.directions),
-            p.total_cost()['movement'],
-            -p.end_position[0]  # negative to prioritize eastward positions
-        ))
-
-        return food_paths[0] if food_paths else None
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.food)
 
     def closest_water(self, game_map, player):
         """Find the closest square with water bonus"""
-        water_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_water_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    water_paths.append(path)
-
-        if not water_paths:
-            return None  # no water found
-
-        # sort paths by distance, then movement cost, then eastward position
-        water_paths.sort(key=lambda p: (
-            len(p.directions),
-            p.total_cost()['movement'],
-            -p.end_position[0]  # negative to prioritize eastward positions
-        ))
-
-        return water_paths[0] if water_paths else None
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.water)
 
     def second_closest_food(self, game_map, player):
         """Find the second closest square with food"""
-        food_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    food_paths.append(path)
-
-        if len(food_paths) < 2:
-            return None  # not enough food sources found
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.food, rank=1)
 
     def second_closest_water(self, game_map, player):
         """Find the second closest square with water bonus"""
-        water_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    water_paths.append(path)
-
-        if len(water_paths) < 2:
-            return None  # not enough water sources found
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.water, rank=1)
 
     def easiest_path(self, game_map, player):
-        """Find the path with the lowest movement cost"""
-        paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.is_passable():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    paths.append(path)
-
-        if not paths:
+        """
+        Find the cheapest path toward the east edge.
+        Candidates are ranked by path cost plus an admissible estimate of the remaining cost
+        to the east edge (columns left times the cheapest terrain), so detours only win when
+        they are really cheaper.
+        With whole_map it is one A* straight to the east edge, searched again only when the
+        player has left the last path: terrain never changes, so the rest of a cheapest path
+        is still a cheapest path from any square on it.
+        """
+        if self.whole_map:
+            _check_whole_map(game_map, "Vision(whole_map=True)")
+            return self._east_path(game_map, player)
+
+        snap = self.snapshot(game_map, player)
+        step = min_move_cost()
+
+        if not snap.passable:
             return None  # No viable paths
 
-        # Sort by movement cost, then eastward position
-        paths.sort(key=lambda p: (
-            p.total_cost()['movement'],
-            -p.end_position[0]  # Negative to prioritize eastward position
+        # Pick by estimated total cost, then eastward position. The estimate is written relative
+        # to the map width (cost - x * step ranks the same as cost + columns left * step), so it also
+        # works on maps without an east edge.
+        best = min(snap.passable, key=lambda c: (
+            snap.costs[c] - c[0] * step,
+            -c[0]  # Negative to prioritize eastward position
         ))
-
-        return paths[0] if paths else None
+        return snap.path_to(best)
 
     def closest_gold(self, game_map, player):
         """Find the closest square with gold bonus"""
-        gold_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    gold_paths.append(path)
-
-        if not gold_paths:
-            return None  # no gold found
-
-        # sort paths by distance, then movement cost, then eastward position
-        gold_paths.sort(key=lambda p: (
-            len(p.directions),
-            p.total_cost()['movement'],
-            -p.end_position[0]  # negative to prioritize eastward positions
-        ))
-
-        return gold_paths[0] if gold_paths else None
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.gold)
 
     def second_closest_gold(self, game_map, player):
         """Find the second closest square with gold bonus"""
-        gold_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    gold_paths.append(path)
-
-        if len(gold_paths) < 2:
-            return None  # not enough gold sources found
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.gold, rank=1)
 
     def closest_trader(self, game_map, player):
         """Find the closest square with a trader"""
-        trader_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    trader_paths.append(path)
-
-        if not trader_paths:
-            return None  # no trader found
-
-        # sort paths by distance, then movement cost, then eastward position
-        trader_paths.sort(key=lambda p: (
-            len(p.directions),
-            p.total_cost()['movement'],
-            -p.end_position[0]  # negative to prioritize eastward positions
-        ))
-
-        return trader_paths[0] if trader_paths else None
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.traders)
 
     def second_closest_trader(self, game_map, player):
         """Find the second closest square with trader"""
-        trader_paths = []
-
-        for coords in self.get_visible_squares(game_map, player):
-            square = game_map.get_square(*coords)
-            if square and square.has_food_bonus():
-                path = self._create_path_to(player.location, coords)
-                if path:
-                    trader_paths.append(path)
-
-        if len(trader_paths) < 2:
-            return None  # not enough traders found
-
-    def _create_path_to(self, start_pos, end_pos):
-        """Create a Path object from start position to end position"""
-        # calculate the direction vector
-        dx = end_pos[0] - start_pos[0]
-        dy = end_pos[1] - start_pos[1]
-
-        # convert to a direction
-        direction = self._get_direction(dx, dy)
-        if not direction:
+        snap = self.snapshot(game_map, player)
+        return snap.nearest(snap.traders, rank=1)
+
+    def nearest_on_map(self, game_map, player, kind, k=3):
+        """
+        Path to the nearest 'food', 'water', 'gold' or 'trader' anywhere on the map, not just in sight.
+        The k closest candidates come from the map's spatial index; the cheapest one to reach wins.
+        """
+        _check_whole_map(game_map, "nearest_on_map")
+        if profiling.active is not None:
+            profiling.active.count('vision.query')
+        start = player.location
+        targets = set(game_map.nearest_items(kind, start[0], start[1], k + 1))
+        targets.discard(start)
+        if not targets:
             return None
-
-        # create and return the path with costs
-        # use placeholder costs for now until map is fully implemented
-        return Path(
-            directions=[direction],
-            start_position=start_pos,
-            end_position=end_pos,
-            movement_costs=[1],  # Placeholder
-            food_costs=[0.5],  # Placeholder
-            water_costs=[0.5]  # Placeholder
-        )
-
-    def _get_direction(self, dx, dy):
-        """Convert a displacement vector to a direction string"""
-        direction_map = {
-            (1, 0): "MoveEast",
-            (-1, 0): "MoveWest",
-            (0, -1): "MoveNorth",
-            (0, 1): "MoveSouth",
-            (1, -1): "MoveNorthEast",
-            (-1, -1): "MoveNorthWest",
-            (1, 1): "MoveSouthEast",
-            (-1, 1): "MoveSouthWest",
-        }
-        return direction_map.get((dx, dy), None)
+        _, parents, goal = search(game_map, start, is_goal=lambda x, y: (x, y) in targets)
+        return build_path(game_map, start, goal, parents) if goal else None
+
+    def _east_path(self, game_map, player):
+        """Rest of the planned path to the east edge from the player's square, planning a new one if needed"""
+        start = player.location
+        plan = self._east_plan
+        if plan is not None and plan[0] is game_map:
+            _, squares, path = plan
+            i = squares.get(start)
+            if i is not None:
+                return Path(path.directions[i:], start, path.end_position, path.movement_costs[i:],
+                            path.food_costs[i:], path.water_costs[i:])
+
+        step = min_move_cost()
+        last_x = game_map.width - 1
+        _, parents, goal = search(game_map, start, is_goal=lambda x, y: x >= last_x,
+                                  heuristic=lambda x, y: (last_x - x) * step)
+        path = build_path(game_map, start, goal, parents) if goal else None
+        if path is None:
+            self._east_plan = None
+            return None
+        # square -> steps taken along the path before it, leaving the goal out
+        squares = {}
+        x, y = start
+        for i, direction in enumerate(path.directions):
+            squares.setdefault((x, y), i)
+            dx, dy = DIRECTION_STEPS[direction]
+            x, y = x + dx, y + dy
+        self._east_plan = (game_map, squares, path)
+        return path
+
+    def _search_area(self, game_map, player, visible=None):
+        """Squares a path may cross: the visible squares plus the player's own, or None for the whole map"""
+        if self.whole_map:
+            _check_whole_map(game_map, "Vision(whole_map=True)")
+            return None
+        area = set(visible if visible is not None else self.get_visible_squares(game_map, player))
+        area.add(player.location)
+        return area
 
 
 class CautiousVision(Vision):